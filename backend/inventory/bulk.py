@@ -0,0 +1,57 @@
+# inventory/bulk.py
+"""
+Bulk edits of a selection of products (``/api/inventory/products/bulk/``).
+
+The selection is locked with one ``SELECT ... FOR UPDATE`` in pk order (as
+``stock.lock_products`` does), then changed with one ``UPDATE`` or deleted
+through ``sync.delete_products``, all in one transaction. Dashboards get a
+single event for the whole batch.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .events import products_changed
+from .models import Product
+from .sync import delete_products
+
+# serial numbers are unique per product; quantities change through the
+# stock ledger (/api/inventory/stock/adjust/)
+NOT_BULK_EDITABLE = {"serial_number", "quantity"}
+
+
+def _lock(queryset):
+    """Lock ``queryset``'s rows in pk order; raise ``ValidationError`` if there are too many."""
+    limit = settings.INVENTORY_BULK_MAX_PRODUCTS
+    rows = list(queryset.select_for_update().order_by("pk")[:limit + 1])
+    if len(rows) > limit:
+        raise serializers.ValidationError(
+            {"detail": f"The selection matches more than {limit} products; narrow it down."}
+        )
+    return rows
+
+
+def update_products(queryset, changes, *, organization_id):
+    """
+    Set the validated ``changes`` (field name to value) on every product of
+    ``queryset``; return their ids.
+    """
+    with transaction.atomic():
+        ids = _lock(queryset.values_list("pk", flat=True))
+        if ids:
+            # update() skips auto_now; delta sync reads updated_at
+            Product.objects.filter(pk__in=ids).update(**changes, updated_at=timezone.now())
+            products_changed(organization_id, "updated", ids)
+    return ids
+
+
+def remove_products(queryset):
+    """Delete every product of ``queryset``, leaving tombstones; return their ids."""
+    with transaction.atomic():
+        # the tombstones and the deletion collector only need these
+        products = _lock(queryset.only("pk", "organization_id"))
+        ids = [product.pk for product in products]
+        if products:
+            delete_products(products)
+    return ids
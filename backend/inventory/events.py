@@ -0,0 +1,32 @@
+# inventory/events.py
+"""
+Product change events pushed to dashboards (see ``ProductEventsView``).
+
+Messages only name what changed; clients fetch the rows themselves, e.g.
+with ``/api/inventory/products/changes/``. Batches of more than
+``MAX_IDS`` products are sent as a count, to keep payloads small.
+"""
+from techapp.events import publish_on_commit
+
+MAX_IDS = 100
+
+
+def organization_group(organization_id):
+    return f"org.{organization_id}"
+
+
+def products_changed(organization_id, kind, product_ids):
+    """``kind`` is ``created``, ``updated`` or ``deleted``."""
+    product_ids = list(product_ids)
+    message = {"type": f"product.{kind}", "count": len(product_ids)}
+    if len(product_ids) <= MAX_IDS:
+        message["ids"] = product_ids
+    publish_on_commit(organization_group(organization_id), message)
+
+
+def stock_adjusted(organization_id, products):
+    """``products`` are the adjusted ``Product`` rows, with their new quantities."""
+    message = {"type": "stock.adjusted", "count": len(products)}
+    if len(products) <= MAX_IDS:
+        message["products"] = [{"id": p.pk, "quantity": p.quantity} for p in products]
+    publish_on_commit(organization_group(organization_id), message)
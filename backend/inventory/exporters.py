@@ -0,0 +1,79 @@
+# inventory/exporters.py
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+from .serializers import ProductSerializer
+
+EXPORT_FIELDS = ProductSerializer.Meta.fields
+
+
+class _ExportRenderer(BaseRenderer):
+    """
+    Export bodies are streamed by the view, so the renderer only has to get
+    ``?format=`` / ``Accept`` through content negotiation. Error payloads
+    (401, 400, ...) are still rendered, as JSON.
+    """
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NDJSONRenderer(_ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line straight back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, chunk_size):
+    return queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def stream_csv(queryset, chunk_size=2000):
+    """Yield the header and then one CSV line per product."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in _rows(queryset, chunk_size):
+        yield writer.writerow(row)
+
+
+def stream_ndjson(queryset, chunk_size=2000):
+    """Yield one JSON object per line per product."""
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in _rows(queryset, chunk_size):
+        yield encoder.encode(dict(zip(EXPORT_FIELDS, row))) + "\n"
+
+
+async def aiterate(lines, batch_size):
+    """
+    Async iterator over the sync generator ``lines``, for ASGI. Django would
+    consume a sync iterator with ``sync_to_async(list)`` and send nothing
+    until the whole export was built; this takes ``batch_size`` lines (one
+    cursor chunk) per hop to the thread that holds the connection.
+    """
+    next_batch = sync_to_async(lambda: list(islice(lines, batch_size)))
+    try:
+        while batch := await next_batch():
+            for line in batch:
+                yield line
+    finally:
+        # closes the server-side cursor when the client goes away early
+        await sync_to_async(lines.close)()
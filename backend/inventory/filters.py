@@ -0,0 +1,96 @@
+from django.utils.dateparse import parse_date
+from rest_framework import filters, serializers
+
+from .models import Product
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` across the identifying text columns. Every term becomes an
+    ``icontains`` match, which the trigram GIN indexes on Product serve.
+    """
+
+    search_fields = ["name", "model", "serial_number", "supplier_name"]
+
+    def get_search_fields(self, view, request):
+        return self.search_fields
+
+
+class ProductFilter(filters.BaseFilterBackend):
+    """
+    Exact filters for the product list:
+
+    ``?category=food,health``, ``?date_supplied_after=2025-01-01``,
+    ``?date_supplied_before=2025-12-31``, ``?quantity_min=1``, ``?quantity_max=10``.
+    """
+
+    params = ("category", "date_supplied_after", "date_supplied_before", "quantity_min", "quantity_max")
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        category = params.get("category")
+        if category:
+            categories = [c for c in category.split(",") if c]
+            valid = {c[0] for c in Product.CATEGORY_CHOICES}
+            invalid = [c for c in categories if c not in valid]
+            if invalid:
+                raise serializers.ValidationError({"category": f"Invalid category: {invalid[0]}"})
+            queryset = queryset.filter(category__in=categories)
+
+        after = self._date(params, "date_supplied_after")
+        if after:
+            queryset = queryset.filter(date_supplied__gte=after)
+        before = self._date(params, "date_supplied_before")
+        if before:
+            queryset = queryset.filter(date_supplied__lte=before)
+
+        quantity_min = self._int(params, "quantity_min")
+        if quantity_min is not None:
+            queryset = queryset.filter(quantity__gte=quantity_min)
+        quantity_max = self._int(params, "quantity_max")
+        if quantity_max is not None:
+            queryset = queryset.filter(quantity__lte=quantity_max)
+
+        return queryset
+
+    def _date(self, params, name):
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise serializers.ValidationError({name: "Use the YYYY-MM-DD format."})
+        return parsed
+
+    def _int(self, params, name):
+        value = params.get(name)
+        if value in (None, ""):
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise serializers.ValidationError({name: "A whole number is required."})
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """
+    Whitelisted ``?ordering=``. The primary key is always appended as a
+    tie-breaker so the keyset cursor stays unique.
+    """
+
+    ordering_fields = ["name", "quantity", "unit_price", "created_at", "updated_at"]
+
+    def get_valid_fields(self, queryset, view, context=None):
+        return [(field, field) for field in self.ordering_fields]
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        ordering = [field for field in ordering if field.lstrip("-") != "id"]
+        ordering.append("-id" if ordering[-1].startswith("-") else "id")
+        return tuple(ordering)
@@ -0,0 +1,157 @@
+# inventory/importers.py
+import codecs
+import csv
+import datetime
+
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from .events import products_changed
+from .models import Product
+from .serializers import ProductImportSerializer
+
+# Stop collecting row errors past this point so a bad file can't blow up the response.
+MAX_REPORTED_ERRORS = 1000
+SERIAL_TAKEN = "product with this serial number already exists."
+
+
+class ImportFileError(Exception):
+    """The uploaded file can't be read as CSV or XLSX."""
+
+
+def read_rows(upload):
+    """
+    Yield one ``dict`` per data row of an uploaded CSV or XLSX file, streaming
+    from the upload rather than loading the whole sheet. Empty cells are
+    dropped so model defaults apply.
+    """
+    name = (upload.name or "").lower()
+    if name.endswith(".xlsx"):
+        rows = _read_xlsx(upload)
+    elif name.endswith(".csv") or upload.content_type in ("text/csv", "application/csv"):
+        rows = _read_csv(upload)
+    else:
+        raise ImportFileError("Upload a .csv or .xlsx file.")
+
+    for row in rows:
+        yield {
+            key.strip(): value.strip() if isinstance(value, str) else value
+            for key, value in row.items()
+            if key and value is not None and value != ""
+        }
+
+
+def _read_csv(upload):
+    lines = codecs.iterdecode(upload, "utf-8-sig")
+    try:
+        yield from csv.DictReader(lines)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f"Could not read CSV: {exc}")
+
+
+def _read_xlsx(upload):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportFileError("XLSX import needs openpyxl installed; upload a CSV instead.")
+
+    try:
+        workbook = openpyxl.load_workbook(upload, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ImportFileError(f"Could not read XLSX: {exc}")
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        for values in rows:
+            row = {}
+            for key, value in zip(header, values):
+                if isinstance(value, datetime.datetime):
+                    value = value.date()
+                row[key] = value
+            yield row
+    finally:
+        workbook.close()
+
+
+def _taken_serials(serials):
+    return set(Product.objects.filter(serial_number__in=serials).values_list("serial_number", flat=True))
+
+
+def import_products(rows, *, request, organization_id, batch_size=1000, strict=False):
+    """
+    Validate ``rows`` with ProductSerializer rules and insert them with
+    ``bulk_create`` in batches of ``batch_size``, all inside one transaction.
+
+    Rows that fail validation, or whose serial_number is already taken, are
+    skipped and reported. With ``strict=True`` any bad row rolls back the
+    whole import. Returns ``{"created", "error_count", "errors"}``.
+    """
+    validator = ProductImportSerializer(context={"request": request})
+    result = {"created": 0, "error_count": 0, "errors": []}
+    seen_serials = set()
+    created_ids = []
+
+    def report(line, detail):
+        result["error_count"] += 1
+        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+            result["errors"].append({"row": line, "errors": detail})
+
+    def insert(rows):
+        """
+        ``bulk_create`` the ``(line, product)`` rows. A serial number
+        committed by a concurrent import or create since ``flush`` checked
+        turns into a row error, and the rest of the batch is retried once.
+        """
+        for attempt in range(2):
+            try:
+                # a savepoint, so a conflict leaves the import's transaction usable
+                with transaction.atomic():
+                    Product.objects.bulk_create([product for _, product in rows], batch_size=batch_size)
+                return [product for _, product in rows]
+            except IntegrityError:
+                taken = _taken_serials({product.serial_number for _, product in rows})
+                for line, product in rows:
+                    if product.serial_number in taken or attempt:
+                        report(line, {"serial_number": [SERIAL_TAKEN]})
+                rows = [(line, product) for line, product in rows if product.serial_number not in taken]
+        return []
+
+    def flush(batch):
+        # one query per batch for serial_number conflicts with existing rows
+        taken = _taken_serials({data.get("serial_number", "") for _, data in batch})
+        rows = []
+        for line, data in batch:
+            serial = data.get("serial_number", "")
+            if serial in taken or serial in seen_serials:
+                report(line, {"serial_number": [SERIAL_TAKEN]})
+                continue
+            seen_serials.add(serial)
+            rows.append((line, Product(**data, organization_id=organization_id, created_by_id=request.user.pk)))
+        products = insert(rows) if rows else []
+        created_ids.extend(product.pk for product in products)
+        result["created"] += len(products)
+
+    with transaction.atomic():
+        batch = []
+        # line 1 is the header row
+        for line, row in enumerate(rows, start=2):
+            try:
+                batch.append((line, validator.run_validation(row)))
+            except serializers.ValidationError as exc:
+                report(line, exc.detail)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+        if strict and result["error_count"]:
+            transaction.set_rollback(True)
+            result["created"] = 0
+        elif created_ids:
+            products_changed(organization_id, "created", created_ids)
+
+    # serial number conflicts are found at flush time, after later rows
+    result["errors"].sort(key=lambda error: error["row"])
+    return result
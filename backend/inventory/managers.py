@@ -0,0 +1,34 @@
+# inventory/managers.py
+from django.db import models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+TOTAL_VALUE = ExpressionWrapper(
+    F("quantity") * F("unit_price"),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+class ProductQuerySet(models.QuerySet):
+    def with_total_value(self):
+        """Compute ``quantity * unit_price`` in SQL as ``total_value``."""
+        return self.annotate(total_value=TOTAL_VALUE)
+
+    def category_summary(self, low_stock_threshold=5):
+        """
+        One row per category with product count, units, stock value and the
+        number of low-stock products, computed in a single GROUP BY.
+        """
+        return (
+            self.order_by()
+            .values("category")
+            .annotate(
+                product_count=Count("id"),
+                total_quantity=Coalesce(Sum("quantity"), 0),
+                total_value=Coalesce(
+                    Sum(TOTAL_VALUE), 0, output_field=TOTAL_VALUE.output_field
+                ),
+                low_stock_count=Count("id", filter=Q(quantity__lte=low_stock_threshold)),
+            )
+            .order_by("category")
+        )
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_remove_product_supplier_product_supplier_address_and_more'),
+        ('organizations', '0006_alter_organization_preference'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['organization', '-updated_at', '-id'], name='inv_product_org_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['organization', 'name', 'id'], name='inv_product_org_name_idx'),
+        ),
+    ]
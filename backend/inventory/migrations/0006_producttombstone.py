@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_stockmovement'),
+        ('organizations', '0007_organization_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_tombstones', to='organizations.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'deleted_at'], name='inv_tombstone_org_deleted_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from organizations.models import Organization
+from .managers import ProductQuerySet
 
 
 class Product(models.Model):
@@ -47,9 +50,102 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
+    # set when the row was loaded through ProductQuerySet.with_total_value()
+    _total_value = None
+
+    class Meta:
+        indexes = [
+            # back the keyset cursors used by ProductCursorPagination
+            models.Index(fields=["organization", "-updated_at", "-id"], name="inv_product_org_updated_idx"),
+            models.Index(fields=["organization", "name", "id"], name="inv_product_org_name_idx"),
+            # trigram indexes serve the icontains lookups behind ?search=
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="inv_product_name_trgm"),
+            GinIndex(OpClass(Upper("model"), name="gin_trgm_ops"), name="inv_product_model_trgm"),
+            GinIndex(OpClass(Upper("serial_number"), name="gin_trgm_ops"), name="inv_product_serial_trgm"),
+            GinIndex(OpClass(Upper("supplier_name"), name="gin_trgm_ops"), name="inv_product_supplier_trgm"),
+        ]
+
     @property
     def total_value(self):
+        if self._total_value is not None:
+            return self._total_value
         return self.quantity * self.unit_price
 
+    @total_value.setter
+    def total_value(self, value):
+        self._total_value = value
+
     def __str__(self):
         return f"{self.name} ({self.organization.name})"
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of stock changes. ``change`` is the signed delta that
+    was applied to ``Product.quantity``; ``quantity_after`` is the balance it
+    left behind.
+    """
+
+    class Kind(models.TextChoices):
+        RECEIPT = "receipt", "Receipt"
+        SALE = "sale", "Sale"
+        ADJUSTMENT = "adjustment", "Adjustment"
+        RETURN = "return", "Return"
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="stock_movements"
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="stock_movements"
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    change = models.IntegerField()
+    quantity_after = models.PositiveIntegerField()
+    note = models.CharField(max_length=300, blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="stock_movements"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["product", "-created_at"], name="inv_movement_product_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.change:+d} – {self.product.name}"
+
+
+class ProductTombstone(models.Model):
+    """
+    Marks a deleted product so delta-sync clients (``inventory/sync.py``)
+    learn about the delete. Written by ``sync.delete_products``; kept until
+    the organization is deleted.
+    """
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="product_tombstones"
+    )
+    product_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["organization", "deleted_at"], name="inv_tombstone_org_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"Product {self.product_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
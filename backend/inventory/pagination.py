@@ -0,0 +1,166 @@
+import datetime
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class ProductCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a composite ordering, e.g. (updated_at, id).
+
+    DRF's stock CursorPagination only seeks on the first ordering field and
+    falls back to an OFFSET for ties. Here the cursor carries the value of
+    every ordering field, so each page is a single index range scan and
+    page N costs the same as page 1. The last ordering field must be unique
+    (the primary key) and none of them may be nullable.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("-updated_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._paginate_results(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views: the page is fetched with the async ORM."""
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._paginate_results([obj async for obj in queryset])
+
+    def _page_queryset(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self._reverse, self._current_position = False, None
+        else:
+            _, self._reverse, self._current_position = self.cursor
+
+        ordering = _reverse_ordering(self.ordering) if self._reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+
+        if self._current_position is not None:
+            queryset = queryset.filter(_keyset_filter(ordering, self._current_position))
+
+        # Fetch one extra row to find out whether another page follows.
+        return queryset[:self.page_size + 1]
+
+    def _paginate_results(self, results):
+        reverse, current_position = self._reverse, self._current_position
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            # rows from .values() are dicts
+            name = field.lstrip("-")
+            attr = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(attr.isoformat() if hasattr(attr, "isoformat") else str(attr))
+        return values
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode("ascii"), validate=True).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+            position = tokens.get("p", [None])[0]
+            if position is not None:
+                position = json.loads(position)
+                if not isinstance(position, list) or len(position) != len(self.ordering):
+                    raise ValueError
+                position = [self._parse_position_value(field, value) for field, value in zip(self.ordering, position)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def _parse_position_value(self, field, value):
+        """Convert a cursor value for its ordering field; a tampered or stale cursor raises."""
+        if not isinstance(value, str) or not value:
+            raise TypeError
+        value = self.model._meta.get_field(field.lstrip("-")).to_python(value)
+        if isinstance(value, datetime.datetime) and timezone.is_naive(value):
+            raise ValueError
+        return value
+
+    def encode_cursor(self, cursor):
+        tokens = {}
+        if cursor.reverse:
+            tokens["r"] = "1"
+        if cursor.position is not None:
+            tokens["p"] = json.dumps(cursor.position, separators=(",", ":"))
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+def _reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith("-") else "-" + field for field in ordering)
+
+
+def _keyset_filter(ordering, position):
+    """
+    Build ``(a, b, c) > (x, y, z)`` in the direction of each ordering field:
+    ``a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)``.
+    """
+    query = Q()
+    equal = {}
+    for field, value in zip(ordering, position):
+        name = field.lstrip("-")
+        lookup = "__lt" if field.startswith("-") else "__gt"
+        query |= Q(**equal, **{name + lookup: value})
+        equal[name] = value
+    return query
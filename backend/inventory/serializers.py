@@ -1,8 +1,10 @@
 from rest_framework import serializers
-from .models import Product
+from techapp.fieldsets import DynamicFieldsMixin
+from .bulk import NOT_BULK_EDITABLE
+from .models import Product, StockMovement
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     total_value = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
 
     class Meta:
@@ -21,4 +23,82 @@ class ProductSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {"unit_price": "Only the superuser can set or change prices."}
             )
+        # opening stock is set on create; after that the stock ledger owns it
+        if self.instance is not None and "quantity" in data:
+            raise serializers.ValidationError(
+                {"quantity": "Change stock through /api/inventory/stock/adjust/."}
+            )
+        return data
+
+
+class ProductImportSerializer(ProductSerializer):
+    """
+    Row validator for bulk imports. Same rules as ProductSerializer, minus the
+    per-row uniqueness query on serial_number: the importer checks a whole
+    batch of serial numbers with one lookup instead.
+    """
+
+    class Meta(ProductSerializer.Meta):
+        extra_kwargs = {"serial_number": {"validators": []}}
+
+
+class ProductSelectionSerializer(serializers.Serializer):
+    """Body of the bulk endpoints; the list's filters come as query parameters."""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False)
+
+
+class ProductBulkUpdateSerializer(ProductSelectionSerializer):
+    """``changes`` are validated once, by ProductSerializer, for the whole selection."""
+    changes = serializers.DictField()
+
+    def validate_changes(self, changes):
+        blocked = sorted(set(changes) & NOT_BULK_EDITABLE)
+        if blocked:
+            raise serializers.ValidationError(f"Cannot be changed in bulk: {', '.join(blocked)}.")
+        product = ProductSerializer(data=changes, partial=True, context=self.context)
+        writable = {name for name, field in product.fields.items() if not field.read_only}
+        unknown = sorted(set(changes) - writable)
+        if unknown:
+            raise serializers.ValidationError(f"Unknown or read-only fields: {', '.join(unknown)}.")
+        if not product.is_valid():
+            raise serializers.ValidationError(product.errors)
+        if not product.validated_data:
+            raise serializers.ValidationError("No changes given.")
+        return product.validated_data
+
+
+class CategorySummarySerializer(serializers.Serializer):
+    category = serializers.CharField()
+    label = serializers.CharField()
+    product_count = serializers.IntegerField()
+    total_quantity = serializers.IntegerField()
+    total_value = serializers.DecimalField(max_digits=14, decimal_places=2)
+    low_stock_count = serializers.IntegerField()
+
+
+class InventorySummarySerializer(serializers.Serializer):
+    product_count = serializers.IntegerField()
+    total_quantity = serializers.IntegerField()
+    total_value = serializers.DecimalField(max_digits=14, decimal_places=2)
+    low_stock_count = serializers.IntegerField()
+    categories = CategorySummarySerializer(many=True)
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    # plain id: products are looked up (and locked) in one query for the whole batch
+    product = serializers.IntegerField(source="product_id")
+
+    class Meta:
+        model = StockMovement
+        fields = ["id", "product", "kind", "change", "quantity_after", "note", "created_by", "created_at"]
+        read_only_fields = ["id", "quantity_after", "created_by", "created_at"]
+
+    def validate(self, data):
+        kind, change = data["kind"], data["change"]
+        if change == 0:
+            raise serializers.ValidationError({"change": "Change cannot be zero."})
+        if kind in (StockMovement.Kind.RECEIPT, StockMovement.Kind.RETURN) and change < 0:
+            raise serializers.ValidationError({"change": f"A {kind} must add stock."})
+        if kind == StockMovement.Kind.SALE and change > 0:
+            raise serializers.ValidationError({"change": "A sale must remove stock."})
         return data
@@ -0,0 +1,75 @@
+# inventory/stock.py
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .events import stock_adjusted
+from .models import Product, StockMovement
+
+
+def lock_products(organization_id, product_ids):
+    """
+    Lock the given products with one ``SELECT ... FOR UPDATE`` ordered by
+    primary key and return them keyed by pk. Must run inside a transaction.
+
+    Locking in pk order means concurrent batches always take row locks in
+    the same sequence and cannot deadlock; other products stay unlocked.
+    Raises ``ValidationError`` if any id is not a product of the organization.
+    """
+    product_ids = set(product_ids)
+    products = {
+        p.pk: p
+        for p in Product.objects.select_for_update()
+        .filter(organization_id=organization_id, pk__in=product_ids)
+        .order_by("pk")
+    }
+    missing = product_ids - products.keys()
+    if missing:
+        raise serializers.ValidationError({"product": f"Product {min(missing)} not found."})
+    return products
+
+
+def apply_movements(movements, *, organization_id, user, products=None):
+    """
+    Apply a batch of validated movements (dicts with ``product_id``, ``kind``,
+    ``change`` and optional ``note``) atomically.
+
+    The touched products are locked with ``lock_products`` (pass
+    ``products`` if the caller already holds the locks). Balances are
+    checked against the locked rows, then written back with one
+    ``bulk_update`` and the ledger rows with one ``bulk_create``: a fixed
+    number of queries however many movements are sent.
+
+    Raises ``ValidationError`` (and writes nothing) if a product is missing
+    or any balance would go negative.
+    """
+    # no savepoint: any failure here must abort the caller's transaction anyway
+    with transaction.atomic(savepoint=False):
+        if products is None:
+            products = lock_products(organization_id, (m["product_id"] for m in movements))
+
+        now = timezone.now()
+        entries = []
+        for m in movements:
+            product = products[m["product_id"]]
+            product.quantity += m["change"]
+            if product.quantity < 0:
+                raise serializers.ValidationError(
+                    {"change": f"Not enough stock for {product.name} (product {product.pk})."}
+                )
+            product.updated_at = now
+            entries.append(StockMovement(
+                organization_id=organization_id,
+                product=product,
+                kind=m["kind"],
+                change=m["change"],
+                quantity_after=product.quantity,
+                note=m.get("note", ""),
+                created_by_id=user.pk,
+            ))
+
+        Product.objects.bulk_update(products.values(), ["quantity", "updated_at"])
+        StockMovement.objects.bulk_create(entries)
+        stock_adjusted(organization_id, [products[pk] for pk in {m["product_id"] for m in movements}])
+
+    return entries
@@ -1,3 +1,998 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import io
+import json
+from base64 import b64encode
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import parse_qs, urlencode, urlsplit
 
-# Create your tests here.
+import openpyxl
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from django.test import AsyncClient, AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+
+from techapp.events import get_backend
+from techapp.querybudget import QueryBudgetTestCase, seed_tenant
+from . import exporters, importers
+from .events import organization_group
+from .filters import ProductOrderingFilter
+from .models import Product, ProductTombstone, StockMovement
+from .serializers import ProductSerializer
+from .views import AsyncProductDetailView, AsyncProductListView, ProductEventsView, ProductListCreateView
+
+
+class InventoryQueryBudgetTests(QueryBudgetTestCase):
+    endpoints = {
+        "inventory-products", "inventory-product-detail", "inventory-product-import",
+        "inventory-product-export", "inventory-stock-adjust", "inventory-summary",
+        "inventory-product-changes", "inventory-product-bulk",
+    }
+
+    def test_product_list(self):
+        for size, owner, org in self.tenants():
+            client = self.client_for(owner)
+            response = self.assertBudget(3, client.get, reverse("inventory-products"), status=200)
+            self.assertEqual(len(response.data["results"]), size)
+            # the user row is cached from here on
+            self.assertBudget(2, client.get, reverse("inventory-products"), {"search": "product", "ordering": "name"}, status=200)
+            self.assertBudget(
+                1, client.get, reverse("inventory-products"),
+                HTTP_IF_NONE_MATCH=response["ETag"], status=304,
+            )
+
+    def test_product_create(self):
+        for size, owner, org in self.tenants():
+            self.assertBudget(
+                3, self.client_for(owner).post, reverse("inventory-products"),
+                {"name": f"new {size}", "serial_number": f"NEW{size}", "unit_price": "5.00"},
+                format="json", status=201,
+            )
+
+    def test_product_detail(self):
+        for size, owner, org in self.tenants():
+            client = self.client_for(owner)
+            product = Product.objects.filter(organization=org).first()
+            url = reverse("inventory-product-detail", args=[product.pk])
+            response = self.assertBudget(3, client.get, url, status=200)
+            # the user row is cached from here on
+            self.assertBudget(1, client.get, url, HTTP_IF_NONE_MATCH=response["ETag"], status=304)
+            self.assertBudget(2, client.patch, url, {"footnote": "patched"}, format="json", status=200)
+            self.assertBudget(5, client.delete, url, status=204)
+
+    def test_bulk(self):
+        for size, owner, org in self.tenants():
+            client = self.client_for(owner)
+            # user, savepoint pair, lock, update
+            response = self.assertBudget(
+                5, client.patch, reverse("inventory-product-bulk") + "?category=electronics",
+                {"changes": {"supplier_name": "Acme"}}, format="json", status=200,
+            )
+            self.assertEqual(response.data["updated"], size)
+            # savepoint pair, lock, tombstones, stock movements, sale lines, delete
+            response = self.assertBudget(
+                7, client.delete, reverse("inventory-product-bulk"),
+                {"ids": response.data["ids"]}, format="json", status=200,
+            )
+            self.assertEqual(response.data["deleted"], size)
+
+    def test_changes(self):
+        for size, owner, org in self.tenants():
+            client = self.client_for(owner)
+            response = self.assertBudget(2, client.get, reverse("inventory-product-changes"), status=200)
+            self.assertEqual(len(response.data["products"]), size)
+            # warm user cache; the tombstone query is the extra one
+            self.assertBudget(
+                2, client.get, reverse("inventory-product-changes"), {"since": response.data["next"]}, status=200,
+            )
+
+    def test_summary(self):
+        for size, owner, org in self.tenants():
+            self.assertBudget(2, self.client_for(owner).get, reverse("inventory-summary"), status=200)
+
+    def test_export(self):
+        for size, owner, org in self.tenants():
+            response = self.assertBudget(2, self.client_for(owner).get, reverse("inventory-product-export"), status=200)
+            self.assertEqual(len(response.streamed_content.splitlines()), size + 1)
+
+    def test_import(self):
+        for size, owner, org in self.tenants():
+            rows = "\n".join(
+                ["name,serial_number,quantity,unit_price"]
+                + [f"import {i},IMP{size}-{i},1,2.50" for i in range(size)]
+            )
+            upload = SimpleUploadedFile("products.csv", rows.encode(), content_type="text/csv")
+            # the insert runs in a savepoint, so a racing serial number is a row error
+            response = self.assertBudget(
+                7, self.client_for(owner).post, reverse("inventory-product-import"),
+                {"file": upload}, format="multipart", status=201,
+            )
+            self.assertEqual(response.data["created"], size)
+
+    def test_stock_adjust(self):
+        for size, owner, org in self.tenants():
+            movements = [
+                {"product": pk, "kind": "sale", "change": -1}
+                for pk in Product.objects.filter(organization=org).values_list("pk", flat=True)
+            ]
+            self.assertBudget(
+                4, self.client_for(owner).post, reverse("inventory-stock-adjust"),
+                movements, format="json", status=201,
+            )
+
+
+class AsyncProductViewTests(QueryBudgetTestCase):
+    def test_list_and_detail_match_sync_views(self):
+        for size, owner, org in self.tenants():
+            client = self.client_for(owner)
+            url = reverse("inventory-products")
+            response = self.assertBudget(3, self.async_view, AsyncProductListView, "get", url, owner)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.content), client.get(url).json())
+
+            product = Product.objects.filter(organization=org).first()
+            url = reverse("inventory-product-detail", args=[product.pk])
+            # the user row was cached by the list request
+            response = self.assertBudget(2, self.async_view, AsyncProductDetailView, "get", url, owner, pk=product.pk)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.content), client.get(url).json())
+
+    def test_errors(self):
+        owner, org = seed_tenant("errors", products=1)
+        response = self.async_view(AsyncProductListView, "get", reverse("inventory-products"))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response.headers)
+
+        response = self.async_view(AsyncProductListView, "get", reverse("inventory-products") + "?category=bogus", owner)
+        self.assertEqual(response.status_code, 400)
+
+        url = reverse("inventory-product-detail", args=[0])
+        response = self.async_view(AsyncProductDetailView, "get", url, owner, pk=0)
+        self.assertEqual(response.status_code, 404)
+
+    def test_writes_go_to_sync_view(self):
+        owner, org = seed_tenant("writes")
+        response = self.async_view(
+            AsyncProductListView, "post", reverse("inventory-products"), owner,
+            {"name": "async", "serial_number": "ASYNC1", "unit_price": "5.00"},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Product.objects.filter(organization=org, serial_number="ASYNC1").exists())
+
+
+class ProductConditionalGetTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("etag", products=3)
+        self.client = self.client_for(self.owner)
+        self.product = Product.objects.filter(organization=self.org).first()
+
+    def test_list_etag_follows_creates_updates_and_deletes(self):
+        url = reverse("inventory-products")
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Cache-Control"], "private, no-cache")
+        self.assertNotIn("Last-Modified", first)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+        self.assertNotEqual(self.client.get(url, {"ordering": "name"})["ETag"], first["ETag"])
+
+        self.client.patch(reverse("inventory-product-detail", args=[self.product.pk]), {"footnote": "patched"}, format="json")
+        updated = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(updated.status_code, 200)
+
+        other = Product.objects.filter(organization=self.org).exclude(pk=self.product.pk).order_by("updated_at").first()
+        self.client.delete(reverse("inventory-product-detail", args=[other.pk]))
+        deleted = self.client.get(url, HTTP_IF_NONE_MATCH=updated["ETag"])
+        self.assertEqual(deleted.status_code, 200)
+        self.assertEqual(len(deleted.data["results"]), 2)
+
+    def test_detail_etag_and_last_modified(self):
+        url = reverse("inventory-product-detail", args=[self.product.pk])
+        first = self.client.get(url)
+        self.assertIn("Last-Modified", first)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code, 304)
+
+        self.client.patch(url, {"footnote": "patched"}, format="json")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 200)
+
+    def test_async_views_answer_304(self):
+        url = reverse("inventory-products")
+        etag = self.client.get(url)["ETag"]
+        request = AsyncRequestFactory().get(
+            url, headers={"authorization": self.authorization(self.owner), "if-none-match": etag}
+        )
+        response = async_to_sync(AsyncProductListView.as_view())(request)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+
+class ProductChangesTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("sync", products=5)
+        self.client = self.client_for(self.owner)
+        self.url = reverse("inventory-product-changes")
+
+    def sync(self, since=None, **params):
+        if since:
+            params["since"] = since
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    @override_settings(INVENTORY_SYNC_LAG_SECONDS=0)
+    def test_reports_creates_updates_and_deletes(self):
+        first = self.sync()
+        self.assertEqual(len(first["products"]), 5)
+        self.assertEqual(first["deleted"], [])
+        self.assertFalse(first["has_more"])
+        self.assertEqual(self.sync(first["next"])["products"], [])
+
+        updated, deleted = Product.objects.filter(organization=self.org)[:2]
+        self.client.patch(reverse("inventory-product-detail", args=[updated.pk]), {"footnote": "patched"}, format="json")
+        self.client.delete(reverse("inventory-product-detail", args=[deleted.pk]))
+        self.client.post(self.url.replace("changes/", ""), {"name": "new", "serial_number": "SYNC-NEW", "unit_price": "1.00"}, format="json")
+
+        delta = self.sync(first["next"])
+        self.assertEqual(
+            sorted(p["id"] for p in delta["products"]),
+            sorted([updated.pk, Product.objects.get(serial_number="SYNC-NEW").pk]),
+        )
+        self.assertEqual(delta["deleted"], [deleted.pk])
+        self.assertTrue(ProductTombstone.objects.filter(organization=self.org, product_id=deleted.pk).exists())
+
+    def test_pages_through_every_product(self):
+        seen, token = [], None
+        while True:
+            page = self.sync(token, page_size=2)
+            seen += [p["id"] for p in page["products"]]
+            token = page["next"]
+            if not page["has_more"]:
+                break
+        self.assertEqual(sorted(seen), sorted(Product.objects.filter(organization=self.org).values_list("pk", flat=True)))
+
+    def test_lag_repeats_recent_changes(self):
+        first = self.sync()
+        self.assertEqual(len(self.sync(first["next"])["products"]), 5)
+
+    def test_invalid_token(self):
+        response = self.client.get(self.url, {"since": "bogus"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("since", response.data)
+
+
+class ProductEventsTests(QueryBudgetTestCase):
+    # routed only under ASGI; the view is called directly here
+    endpoints = {"inventory-events"}
+
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("events", products=3)
+        self.client = self.client_for(self.owner)
+        self.group = organization_group(self.org.pk)
+
+    def test_stream(self):
+        async def scenario():
+            request = AsyncRequestFactory().get("/api/inventory/events/", headers={"authorization": authorization})
+            response = await ProductEventsView.as_view()(request)
+            stream = aiter(response.streaming_content)
+            chunks = [await anext(stream)]
+            get_backend().publish(self.group, {"type": "product.updated", "count": 1, "ids": [1]})
+            chunks.append(await anext(stream))
+            await stream.aclose()
+            return response, chunks
+
+        authorization = self.authorization(self.owner)
+        with self.assertNumQueries(1):
+            response, chunks = async_to_sync(scenario)()
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(chunks[0], b"retry: 5000\n\n")
+        self.assertEqual(chunks[1], b'event: product.updated\ndata: {"type": "product.updated", "count": 1, "ids": [1]}\n\n')
+        self.assertNotIn(self.group, get_backend()._groups)
+
+    def test_requires_authentication(self):
+        response = self.async_view(ProductEventsView, "get", "/api/inventory/events/")
+        self.assertEqual(response.status_code, 401)
+
+    def received(self, action):
+        """Messages published to the organization once ``action`` commits."""
+        async def scenario():
+            subscription = get_backend().subscribe(self.group)
+            try:
+                await sync_to_async(action)()
+                await asyncio.sleep(0)
+                messages = []
+                while not subscription.queue.empty():
+                    messages.append(subscription.queue.get_nowait())
+                return messages
+            finally:
+                subscription.close()
+
+        return async_to_sync(scenario)()
+
+    def test_writes_publish_on_commit(self):
+        product = Product.objects.filter(organization=self.org).first()
+        detail = reverse("inventory-product-detail", args=[product.pk])
+
+        def write(method, *args, **kwargs):
+            def action():
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = method(*args, format="json", **kwargs)
+                self.assertLess(response.status_code, 300, getattr(response, "data", None))
+            return self.received(action)
+
+        [created] = write(self.client.post, reverse("inventory-products"), {"name": "n", "serial_number": "EV-1", "unit_price": "1.00"})
+        self.assertEqual(created["type"], "product.created")
+        self.assertEqual(created["ids"], [Product.objects.get(serial_number="EV-1").pk])
+
+        [updated] = write(self.client.patch, detail, {"footnote": "patched"})
+        self.assertEqual(updated, {"type": "product.updated", "count": 1, "ids": [product.pk]})
+
+        [adjusted] = write(
+            self.client.post, reverse("inventory-stock-adjust"),
+            {"movements": [{"product": product.pk, "kind": "receipt", "change": 1}]},
+        )
+        self.assertEqual(adjusted, {"type": "stock.adjusted", "count": 1, "products": [{"id": product.pk, "quantity": 1001}]})
+
+        [deleted] = write(self.client.delete, detail)
+        self.assertEqual(deleted, {"type": "product.deleted", "count": 1, "ids": [product.pk]})
+
+    def test_nothing_published_without_commit(self):
+        self.assertEqual(self.received(lambda: self.client.patch(
+            reverse("inventory-product-detail", args=[Product.objects.filter(organization=self.org).first().pk]),
+            {"footnote": "patched"}, format="json",
+        )), [])
+
+
+class ProductValuesParityTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("parity", products=5)
+        products = list(Product.objects.filter(organization=self.org))
+        # optional fields empty on some rows, set on others
+        products[0].date_supplied = datetime.date(2024, 2, 29)
+        products[0].supplier_email = "s@example.com"
+        products[1].unit_price = Decimal("0.10")
+        products[1].quantity = 0
+        Product.objects.bulk_update(products, ["date_supplied", "supplier_email", "unit_price", "quantity"])
+
+    def assertParity(self):
+        queryset = Product.objects.filter(organization=self.org).with_total_value().order_by("id")
+        values = ProductListCreateView.values_serializer
+        self.assertEqual(
+            values.represent(values.queryset(queryset)),
+            ProductSerializer(queryset, many=True).data,
+        )
+
+    def test_matches_product_serializer(self):
+        self.assertParity()
+
+    def test_matches_in_an_activated_time_zone(self):
+        with timezone.override("Africa/Lagos"):
+            self.assertParity()
+
+    def test_list_pages_follow(self):
+        client = self.client_for(self.owner)
+        seen, url = [], reverse("inventory-products") + "?page_size=2&ordering=-unit_price"
+        while url:
+            page = client.get(url).data
+            seen += page["results"]
+            url = page["next"]
+        expected = ProductSerializer(
+            Product.objects.filter(organization=self.org).with_total_value().order_by("-unit_price", "-id"), many=True,
+        ).data
+        self.assertEqual(seen, expected)
+
+
+class SparseFieldsetTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("sparse", products=5)
+        self.client = self.client_for(self.owner)
+
+    def test_list_fields_and_omit(self):
+        response = self.client.get(reverse("inventory-products"), {"fields": "id,name,total_value"})
+        self.assertEqual(response.status_code, 200)
+        expected = ProductSerializer(
+            Product.objects.filter(organization=self.org).with_total_value().order_by("-updated_at", "-id"), many=True,
+        ).data
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": row["id"], "name": row["name"], "total_value": row["total_value"]} for row in expected],
+        )
+
+        response = self.client.get(reverse("inventory-products"), {"omit": "supplier_address,footnote"})
+        self.assertEqual(set(response.json()["results"][0]), set(ProductSerializer.Meta.fields) - {"supplier_address", "footnote"})
+
+    def test_unused_columns_are_not_selected(self):
+        url = reverse("inventory-products")
+        self.client.get(url)  # cache the user row
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {"fields": "id,name"})
+        self.assertNotIn("supplier_address", queries[-1]["sql"])
+
+        product = Product.objects.filter(organization=self.org).first()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("inventory-product-detail", args=[product.pk]), {"fields": "name,total_value"})
+        self.assertEqual(response.json(), {"name": product.name, "total_value": f"{product.total_value:.2f}"})
+        self.assertNotIn("supplier_address", queries[-1]["sql"])
+
+    def test_pages_follow_without_the_ordering_fields(self):
+        seen, url = [], reverse("inventory-products") + "?page_size=2&fields=name&ordering=quantity"
+        while url:
+            page = self.client.get(url).json()
+            seen += page["results"]
+            url = page["next"]
+        names = Product.objects.filter(organization=self.org).order_by("quantity", "id").values_list("name", flat=True)
+        self.assertEqual(seen, [{"name": name} for name in names])
+
+    def test_async_list_matches_sync(self):
+        url = reverse("inventory-products") + "?fields=id,created_at&page_size=2"
+        response = self.async_view(AsyncProductListView, "get", url, self.owner)
+        self.assertEqual(json.loads(response.content), self.client.get(url).json())
+
+    def test_changes(self):
+        response = self.client.get(reverse("inventory-product-changes"), {"fields": "id", "page_size": 2})
+        self.assertEqual(response.json()["products"][0].keys(), {"id"})
+        self.assertTrue(response.json()["has_more"])
+        # entries without an id could not be applied
+        products = self.client.get(reverse("inventory-product-changes"), {"fields": "name"}).json()["products"]
+        self.assertEqual({tuple(product) for product in products}, {("id", "name")})
+        products = self.client.get(reverse("inventory-product-changes"), {"omit": "id"}).json()["products"]
+        self.assertTrue(products)
+        self.assertTrue(all("id" in product for product in products))
+
+    def test_detail_etag_depends_on_fields(self):
+        url = reverse("inventory-product-detail", args=[Product.objects.filter(organization=self.org).first().pk])
+        etag = self.client.get(url, {"fields": "name"})["ETag"]
+        self.assertEqual(self.client.get(url, {"fields": "name"}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unknown_fields(self):
+        response = self.client.get(reverse("inventory-products"), {"fields": "name,password"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"fields": "Unknown fields: password."})
+        response = self.client.get(reverse("inventory-products"), {"fields": "name", "omit": "name"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_writes_ignore_fieldsets(self):
+        response = self.client.post(
+            reverse("inventory-products") + "?fields=id",
+            {"name": "full", "serial_number": "FULL1", "unit_price": "5.00"}, format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("serial_number", response.json())
+
+
+class ProductBulkTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("bulk", products=4, staff=1)
+        self.client = self.client_for(self.owner)
+        self.url = reverse("inventory-product-bulk")
+        self.ids = list(Product.objects.filter(organization=self.org).order_by("id").values_list("id", flat=True))
+
+    def test_update_by_ids(self):
+        before = Product.objects.get(pk=self.ids[0]).updated_at
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.patch(
+                self.url, {"ids": self.ids[:2], "changes": {"unit_price": "12.50", "supplier_name": "Acme"}},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"updated": 2, "ids": self.ids[:2]})
+        self.assertEqual(len(callbacks), 1)
+        changed = Product.objects.get(pk=self.ids[0])
+        self.assertEqual((changed.unit_price, changed.supplier_name), (Decimal("12.50"), "Acme"))
+        self.assertGreater(changed.updated_at, before)
+        self.assertEqual(Product.objects.get(pk=self.ids[2]).supplier_name, "")
+
+    def test_filters_select_and_intersect_with_ids(self):
+        Product.objects.filter(pk=self.ids[0]).update(category="food")
+        response = self.client.patch(self.url + "?category=food", {"changes": {"footnote": "x"}}, format="json")
+        self.assertEqual(response.data["ids"], [self.ids[0]])
+        response = self.client.patch(
+            self.url + "?category=electronics", {"ids": self.ids[:2], "changes": {"footnote": "y"}}, format="json",
+        )
+        self.assertEqual(response.data["ids"], [self.ids[1]])
+
+    def test_needs_a_selection(self):
+        response = self.client.patch(self.url, {"changes": {"footnote": "x"}}, format="json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.delete(self.url + "?search=", format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Product.objects.filter(organization=self.org).count(), 4)
+
+    def test_rejected_changes(self):
+        for changes in (
+            {"serial_number": "SAME"}, {"quantity": 0}, {"created_by": 1}, {"category": "bogus"}, {},
+        ):
+            response = self.client.patch(self.url, {"ids": self.ids, "changes": changes}, format="json")
+            self.assertEqual(response.status_code, 400, changes)
+            self.assertIn("changes", response.data)
+
+    def test_price_rule_applies(self):
+        staff = self.org.memberships.exclude(user=self.owner).get().user
+        response = self.client_for(staff).patch(
+            self.url, {"ids": self.ids, "changes": {"unit_price": "1.00"}}, format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Product.objects.filter(unit_price=Decimal("1.00")).exists())
+
+    def test_needs_inventory_permission(self):
+        staff = self.org.memberships.exclude(user=self.owner).get()
+        staff.can_manage_inventory = False
+        staff.save()
+        response = self.client_for(staff.user).patch(
+            self.url, {"ids": self.ids, "changes": {"footnote": "x"}}, format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_other_organizations_are_untouched(self):
+        other_owner, other_org = seed_tenant("other", products=1)
+        other_id = Product.objects.get(organization=other_org).pk
+        response = self.client.delete(self.url, {"ids": [other_id, self.ids[0]]}, format="json")
+        self.assertEqual(response.data, {"deleted": 1, "ids": [self.ids[0]]})
+        self.assertTrue(Product.objects.filter(pk=other_id).exists())
+
+    def test_delete_leaves_tombstones(self):
+        response = self.client.delete(self.url + "?category=electronics", format="json")
+        self.assertEqual(response.data["deleted"], 4)
+        self.assertFalse(Product.objects.filter(organization=self.org).exists())
+        self.assertEqual(
+            sorted(ProductTombstone.objects.filter(organization=self.org).values_list("product_id", flat=True)),
+            self.ids,
+        )
+
+    @override_settings(INVENTORY_BULK_MAX_PRODUCTS=3)
+    def test_selection_limit(self):
+        response = self.client.patch(self.url + "?category=electronics", {"changes": {"footnote": "x"}}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Product.objects.filter(footnote="x").exists())
+
+
+class ProductPaginationTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("pages", products=7)
+        self.client = self.client_for(self.owner)
+        self.url = reverse("inventory-products")
+        products = list(Product.objects.filter(organization=self.org).order_by("id"))
+        for i, product in enumerate(products):
+            product.name = f"item {(i * 3) % 7}"
+            product.quantity = i % 3  # ties, broken by id
+            product.unit_price = Decimal(10 - i)
+        Product.objects.bulk_update(products, ["name", "quantity", "unit_price"])
+        # every row shares one updated_at
+        Product.objects.filter(organization=self.org).update(updated_at=timezone.now())
+
+    def walk(self, params):
+        pages, url = [], self.url + "?" + params
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+            url = pages[-1]["next"]
+        return pages
+
+    def ids(self, *ordering):
+        return list(Product.objects.filter(organization=self.org).order_by(*ordering).values_list("id", flat=True))
+
+    def test_ties_on_updated_at(self):
+        pages = self.walk("page_size=2")
+        self.assertEqual([row["id"] for page in pages for row in page["results"]], self.ids("-updated_at", "-id"))
+
+    def test_previous_walks_back(self):
+        pages = self.walk("page_size=3")
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]["previous"])
+        seen, url = [], pages[-1]["previous"]
+        while url:
+            page = self.client.get(url).json()
+            seen = [row["id"] for row in page["results"]] + seen
+            url = page["previous"]
+        self.assertEqual(seen, [row["id"] for page in pages[:-1] for row in page["results"]])
+
+    def test_each_ordering(self):
+        for field in ProductOrderingFilter.ordering_fields:
+            for ordering, expected in ((field, (field, "id")), ("-" + field, ("-" + field, "-id"))):
+                with self.subTest(ordering=ordering):
+                    pages = self.walk(f"page_size=2&ordering={ordering}")
+                    self.assertEqual([row["id"] for page in pages for row in page["results"]], self.ids(*expected))
+
+    def test_tampered_cursors_are_404(self):
+        def cursor(position):
+            return b64encode(urlencode({"p": json.dumps(position)}).encode()).decode()
+
+        name_cursor = parse_qs(urlsplit(self.walk("page_size=6&ordering=name")[0]["next"]).query)["cursor"][0]
+        for params in (
+            {"cursor": cursor(["not a date", "1"])},
+            {"cursor": cursor([{"a": 1}, "1"])},
+            {"cursor": cursor(["2024-01-01T00:00:00", "1"])},
+            {"cursor": cursor(["2024-01-01T00:00:00Z", "x"])},
+            {"cursor": name_cursor, "ordering": "quantity"},
+            {"cursor": "%%%"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 404)
+
+
+class ProductFilterTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("filters")
+        self.client = self.client_for(self.owner)
+        rows = [
+            # name, model, serial, supplier, category, quantity, date supplied
+            ("Solar lamp", "SL-1", "FLT-001", "Sunny Ltd", "electronics", 0, datetime.date(2025, 1, 10)),
+            ("Rice 50kg", "", "FLT-002", "Grain Co", "food", 5, datetime.date(2025, 3, 1)),
+            ("Paracetamol", "PX", "FLT-003", "Medix", "health", 20, datetime.date(2025, 6, 30)),
+            ("Beans", "", "FLT-004", "Sunny Ltd", "food", 100, None),
+        ]
+        Product.objects.bulk_create([
+            Product(
+                organization=self.org, created_by=self.owner, name=name, model=model, serial_number=serial,
+                supplier_name=supplier, category=category, quantity=quantity, date_supplied=supplied,
+                unit_price=Decimal("1.00"),
+            )
+            for name, model, serial, supplier, category, quantity, supplied in rows
+        ])
+
+    def names(self, params):
+        response = self.client.get(reverse("inventory-products"), {**params, "ordering": "name"})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["name"] for row in response.json()["results"]]
+
+    def test_category(self):
+        self.assertEqual(self.names({"category": "food"}), ["Beans", "Rice 50kg"])
+        self.assertEqual(self.names({"category": "food,health"}), ["Beans", "Paracetamol", "Rice 50kg"])
+
+    def test_date_supplied_range(self):
+        self.assertEqual(self.names({"date_supplied_after": "2025-03-01"}), ["Paracetamol", "Rice 50kg"])
+        self.assertEqual(self.names({"date_supplied_before": "2025-03-01"}), ["Rice 50kg", "Solar lamp"])
+        self.assertEqual(
+            self.names({"date_supplied_after": "2025-02-01", "date_supplied_before": "2025-04-01"}), ["Rice 50kg"],
+        )
+
+    def test_quantity_range(self):
+        self.assertEqual(self.names({"quantity_min": "5"}), ["Beans", "Paracetamol", "Rice 50kg"])
+        self.assertEqual(self.names({"quantity_max": "5"}), ["Rice 50kg", "Solar lamp"])
+        self.assertEqual(self.names({"quantity_min": "1", "quantity_max": "20"}), ["Paracetamol", "Rice 50kg"])
+
+    def test_bad_values_are_400(self):
+        for params in (
+            {"category": "bogus"}, {"date_supplied_after": "01/03/2025"}, {"date_supplied_before": "2025-02-30"},
+            {"quantity_min": "many"}, {"quantity_max": "1.5"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(reverse("inventory-products"), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(params)), response.json())
+
+    def test_search_matches_each_column(self):
+        for term, expected in (
+            ("lamp", ["Solar lamp"]),  # name
+            ("px", ["Paracetamol"]),  # model, any case
+            ("flt-00", ["Beans", "Paracetamol", "Rice 50kg", "Solar lamp"]),  # serial number
+            ("sunny", ["Beans", "Solar lamp"]),  # supplier
+            ("sunny lamp", ["Solar lamp"]),  # every term must match
+        ):
+            with self.subTest(term=term):
+                self.assertEqual(self.names({"search": term}), expected)
+
+    def test_ordering_whitelist(self):
+        # fields off the whitelist are ignored, and the default ordering applies
+        response = self.client.get(reverse("inventory-products"), {"ordering": "supplier_email"})
+        self.assertEqual(
+            [row["id"] for row in response.json()["results"]],
+            list(Product.objects.filter(organization=self.org).order_by("-updated_at", "-id").values_list("id", flat=True)),
+        )
+
+
+class ProductValuationTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("valuation")
+        rows = [
+            ("electronics", 2, "10.50"), ("electronics", 5, "3.00"), ("electronics", 40, "1.25"),
+            ("food", 0, "7.00"), ("food", 6, "2.50"),
+        ]
+        Product.objects.bulk_create([
+            Product(
+                organization=self.org, created_by=self.owner, name=f"p{i}", serial_number=f"VAL{i}",
+                category=category, quantity=quantity, unit_price=Decimal(price),
+            )
+            for i, (category, quantity, price) in enumerate(rows)
+        ])
+        # another tenant's stock is left out
+        seed_tenant("valuation-other", products=3)
+
+    def test_category_summary(self):
+        rows = list(Product.objects.filter(organization=self.org).category_summary())
+        self.assertEqual(rows, [
+            {"category": "electronics", "product_count": 3, "total_quantity": 47,
+             "total_value": Decimal("86.00"), "low_stock_count": 2},
+            {"category": "food", "product_count": 2, "total_quantity": 6,
+             "total_value": Decimal("15.00"), "low_stock_count": 1},
+        ])
+
+    def test_low_stock_threshold_is_inclusive(self):
+        counts = {
+            threshold: {
+                row["category"]: row["low_stock_count"]
+                for row in Product.objects.filter(organization=self.org).category_summary(threshold)
+            }
+            for threshold in (0, 2, 6, 40)
+        }
+        self.assertEqual(counts, {
+            0: {"electronics": 0, "food": 1},
+            2: {"electronics": 1, "food": 1},
+            6: {"electronics": 2, "food": 2},
+            40: {"electronics": 3, "food": 2},
+        })
+
+    def test_summary_endpoint(self):
+        response = self.client_for(self.owner).get(reverse("inventory-summary"), {"low_stock": 2})
+        data = response.json()
+        self.assertEqual(
+            (data["product_count"], data["total_quantity"], data["total_value"], data["low_stock_count"]),
+            (5, 53, "101.00", 2),
+        )
+        self.assertEqual([c["label"] for c in data["categories"]], ["Electronics", "Food & Beverage"])
+        self.assertEqual(self.client_for(self.owner).get(reverse("inventory-summary"), {"low_stock": "x"}).status_code, 400)
+
+    def test_annotation_overrides_the_property(self):
+        product = Product.objects.filter(organization=self.org).with_total_value().get(serial_number="VAL0")
+        self.assertEqual(product.total_value, Decimal("21.00"))
+        # the annotation is what the database computed, even if the row changes in memory
+        product.quantity = 100
+        self.assertEqual(product.total_value, Decimal("21.00"))
+        plain = Product.objects.get(serial_number="VAL0")
+        plain.quantity = 100
+        self.assertEqual(plain.total_value, Decimal("1050.00"))
+
+
+class ProductImportTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("import", products=1)
+        self.client = self.client_for(self.owner)
+        self.existing = Product.objects.get(organization=self.org).serial_number
+
+    def post(self, content, name="products.csv", **data):
+        upload = SimpleUploadedFile(name, content, content_type="text/csv" if name.endswith(".csv") else None)
+        return self.client.post(reverse("inventory-product-import"), {"file": upload, **data}, format="multipart")
+
+    def csv(self, *lines):
+        return "\n".join(["name,serial_number,quantity,unit_price", *lines]).encode()
+
+    def test_duplicate_serial_in_the_file(self):
+        response = self.post(self.csv("a,DUP1,1,2.50", "b,DUP1,1,2.50", "c,OK1,1,2.50"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["created"], response.data["error_count"]), (2, 1))
+        self.assertEqual(response.data["errors"][0]["row"], 3)
+        self.assertEqual(Product.objects.get(serial_number="DUP1").name, "a")
+
+    def test_serial_already_taken(self):
+        response = self.post(self.csv(f"a,{self.existing},1,2.50", "b,NEW1,1,2.50"))
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["errors"], [
+            {"row": 2, "errors": {"serial_number": ["product with this serial number already exists."]}},
+        ])
+
+    def test_strict_rolls_back(self):
+        content = self.csv("a,S1,1,2.50", "b,S2,lots,2.50")
+        response = self.post(content, strict="true")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data["created"], response.data["error_count"]), (0, 1))
+        self.assertFalse(Product.objects.filter(serial_number="S1").exists())
+
+        response = self.post(content)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        self.assertIn("quantity", response.data["errors"][0]["errors"])
+
+    def test_serial_taken_by_a_concurrent_writer(self):
+        Product.objects.create(organization=self.org, name="racer", serial_number="RACE1", unit_price=Decimal("1.00"))
+        taken_serials, calls = importers._taken_serials, []
+
+        def checked_before_the_racer_committed(serials):
+            calls.append(serials)
+            return set() if len(calls) == 1 else taken_serials(serials)
+
+        with mock.patch.object(importers, "_taken_serials", side_effect=checked_before_the_racer_committed):
+            response = self.post(self.csv("a,RACE0,1,2.50", "b,RACE1,1,2.50", "c,RACE2,1,2.50"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["errors"][0]["row"], 3)
+        self.assertEqual(Product.objects.get(serial_number="RACE1").name, "racer")
+        self.assertEqual(Product.objects.filter(serial_number__in=["RACE0", "RACE2"]).count(), 2)
+
+    def test_xlsx(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(["name", "serial_number", "quantity", "unit_price", "date_supplied", "model"])
+        sheet.append(["Sheet lamp", "XL1", 3, 4.5, datetime.datetime(2025, 5, 17), None])
+        sheet.append(["Sheet fan", "XL2", 1, "9.99", None, "F-2"])
+        content = io.BytesIO()
+        workbook.save(content)
+
+        response = self.post(content.getvalue(), name="products.xlsx")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["created"], 2)
+        lamp = Product.objects.get(serial_number="XL1")
+        self.assertEqual(
+            (lamp.quantity, lamp.unit_price, lamp.date_supplied, lamp.model),
+            (3, Decimal("4.50"), datetime.date(2025, 5, 17), ""),
+        )
+        self.assertEqual(Product.objects.get(serial_number="XL2").model, "F-2")
+
+    def test_unreadable_files(self):
+        self.assertEqual(self.post(b"x", name="products.txt").status_code, 400)
+        self.assertEqual(self.post(b"not a zip", name="products.xlsx").status_code, 400)
+
+
+class ProductExportTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("export", products=3)
+        self.client = self.client_for(self.owner)
+        self.url = reverse("inventory-product-export")
+        product = Product.objects.filter(organization=self.org).order_by("id").first()
+        product.name, product.quantity, product.unit_price = 'Lamp, "solar"', 3, Decimal("2.50")
+        product.save()
+        self.products = list(Product.objects.filter(organization=self.org).with_total_value().order_by("id"))
+
+    def body(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv(self):
+        for params, headers in (({}, {}), ({"format": "csv"}, {}), ({}, {"HTTP_ACCEPT": "text/csv"})):
+            with self.subTest(params=params, headers=headers):
+                response = self.client.get(self.url, params, **headers)
+                self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+                self.assertEqual(response["Content-Disposition"], 'attachment; filename="products.csv"')
+                rows = list(csv.reader(io.StringIO(self.body(response))))
+                self.assertEqual(rows[0], list(ProductSerializer.Meta.fields))
+                self.assertEqual([int(row[0]) for row in rows[1:]], [p.pk for p in self.products])
+                first = dict(zip(rows[0], rows[1]))
+                self.assertEqual(
+                    (first["name"], first["quantity"], first["unit_price"], first["total_value"]),
+                    ('Lamp, "solar"', "3", "2.50", "7.50"),
+                )
+
+    def test_ndjson(self):
+        for params, headers in (({"format": "ndjson"}, {}), ({}, {"HTTP_ACCEPT": "application/x-ndjson"})):
+            with self.subTest(params=params, headers=headers):
+                response = self.client.get(self.url, params, **headers)
+                self.assertEqual(response["Content-Type"], "application/x-ndjson")
+                lines = [json.loads(line) for line in self.body(response).splitlines()]
+                self.assertEqual([line["id"] for line in lines], [p.pk for p in self.products])
+                self.assertEqual(list(lines[0]), list(ProductSerializer.Meta.fields))
+                self.assertEqual(
+                    (lines[0]["name"], lines[0]["unit_price"], lines[0]["total_value"], lines[0]["organization"]),
+                    ('Lamp, "solar"', "2.50", "7.50", self.org.pk),
+                )
+
+    def test_filters_apply(self):
+        Product.objects.filter(pk=self.products[0].pk).update(category="food")
+        response = self.client.get(self.url, {"format": "ndjson", "category": "food"})
+        self.assertEqual([json.loads(line)["id"] for line in self.body(response).splitlines()], [self.products[0].pk])
+
+    def test_streams_under_asgi(self):
+        read = []
+        rows = exporters._rows
+
+        def counting_rows(queryset, chunk_size):
+            for row in rows(queryset, chunk_size):
+                read.append(row)
+                yield row
+
+        async def export():
+            response = await AsyncClient().get(
+                self.url, {"format": "ndjson"}, headers={"authorization": authorization}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            chunks = aiter(response.streaming_content)
+            first = await anext(chunks)
+            read_before_rest = len(read)
+            return [first, *[chunk async for chunk in chunks]], read_before_rest
+
+        authorization = self.authorization(self.owner)
+        with override_settings(INVENTORY_EXPORT_CHUNK_SIZE=1), mock.patch.object(exporters, "_rows", counting_rows):
+            chunks, read_before_rest = async_to_sync(export)()
+        # the first line went out after one cursor chunk, not the whole export
+        self.assertEqual(read_before_rest, 1)
+        lines = b"".join(chunks).decode().splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], [p.pk for p in self.products])
+
+
+class StockLedgerTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("ledger", products=3)
+        self.client = self.client_for(self.owner)
+        self.url = reverse("inventory-stock-adjust")
+        self.products = list(Product.objects.filter(organization=self.org).order_by("id"))
+        Product.objects.filter(pk=self.products[0].pk).update(quantity=5)
+
+    def adjust(self, movements):
+        # apply_movements takes no savepoint of its own (a failure aborts the
+        # request's transaction); give it one so the test can keep querying
+        with transaction.atomic():
+            return self.client.post(self.url, {"movements": movements}, format="json")
+
+    def test_ledger_rows(self):
+        first, second = self.products[0].pk, self.products[1].pk
+        response = self.adjust([
+            {"product": first, "kind": "sale", "change": -2, "note": "till 1"},
+            {"product": second, "kind": "receipt", "change": 10},
+            {"product": first, "kind": "return", "change": 1},
+        ])
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(
+            list(StockMovement.objects.order_by("id").values_list("product_id", "kind", "change", "quantity_after", "note", "created_by_id")),
+            [
+                (first, "sale", -2, 3, "till 1", self.owner.pk),
+                (second, "receipt", 10, 1010, "", self.owner.pk),
+                (first, "return", 1, 4, "", self.owner.pk),
+            ],
+        )
+        self.assertEqual(Product.objects.get(pk=first).quantity, 4)
+        self.assertEqual([row["quantity_after"] for row in response.data], [3, 1010, 4])
+
+    def test_negative_balance_rolls_back_the_batch(self):
+        before = Product.objects.get(pk=self.products[1].pk).updated_at
+        response = self.adjust([
+            {"product": self.products[1].pk, "kind": "receipt", "change": 5},
+            {"product": self.products[0].pk, "kind": "sale", "change": -4},
+            {"product": self.products[0].pk, "kind": "sale", "change": -2},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Not enough stock", str(response.data["change"]))
+        self.assertFalse(StockMovement.objects.exists())
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).quantity, 5)
+        self.assertEqual(Product.objects.get(pk=self.products[1].pk).updated_at, before)
+
+    def test_products_are_locked_in_pk_order(self):
+        ids = [product.pk for product in self.products]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.adjust([{"product": pk, "kind": "receipt", "change": 1} for pk in reversed(ids)])
+        self.assertEqual(response.status_code, 201)
+        [lock] = [query["sql"] for query in queries if "FOR UPDATE" in query["sql"]]
+        self.assertIn('ORDER BY "inventory_product"."id" ASC', lock)
+
+    def test_invalid_movements(self):
+        for movement in (
+            {"product": self.products[0].pk, "kind": "sale", "change": 1},
+            {"product": self.products[0].pk, "kind": "receipt", "change": -1},
+            {"product": self.products[0].pk, "kind": "adjustment", "change": 0},
+            {"product": 0, "kind": "receipt", "change": 1},
+        ):
+            with self.subTest(movement=movement):
+                self.assertEqual(self.adjust([movement]).status_code, 400)
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_quantity_is_not_editable_on_the_product(self):
+        url = reverse("inventory-product-detail", args=[self.products[0].pk])
+        for method in (self.client.patch, self.client.put):
+            response = method(url, {"name": "x", "serial_number": "LEDGER-X", "unit_price": "1.00", "quantity": 99}, format="json")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("quantity", response.data)
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).quantity, 5)
+        # opening stock is still set on create
+        response = self.client.post(
+            reverse("inventory-products"), {"name": "new", "serial_number": "LEDGER-N", "unit_price": "1.00", "quantity": 7},
+            format="json",
+        )
+        self.assertEqual(response.data["quantity"], 7)
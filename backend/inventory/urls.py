@@ -1,7 +1,24 @@
+from django.conf import settings
 from django.urls import path
-from .views import ProductListCreateView, ProductDetailView
+from .views import (
+    ProductListCreateView, ProductDetailView, InventorySummaryView, ProductImportView, ProductExportView,
+    StockAdjustView, ProductBulkView, ProductChangesView, ProductEventsView, AsyncProductListView, AsyncProductDetailView,
+)
+
+ProductListView = AsyncProductListView if settings.ASYNC_VIEWS else ProductListCreateView
+ProductView = AsyncProductDetailView if settings.ASYNC_VIEWS else ProductDetailView
 
 urlpatterns = [
-    path("products/", ProductListCreateView.as_view(), name="inventory-products"),
-    path("products/<int:pk>/", ProductDetailView.as_view(), name="inventory-product-detail"),
+    path("products/", ProductListView.as_view(), name="inventory-products"),
+    path("products/bulk/", ProductBulkView.as_view(), name="inventory-product-bulk"),
+    path("products/changes/", ProductChangesView.as_view(), name="inventory-product-changes"),
+    path("products/export/", ProductExportView.as_view(), name="inventory-product-export"),
+    path("products/import/", ProductImportView.as_view(), name="inventory-product-import"),
+    path("products/<int:pk>/", ProductView.as_view(), name="inventory-product-detail"),
+    path("stock/adjust/", StockAdjustView.as_view(), name="inventory-stock-adjust"),
+    path("summary/", InventorySummaryView.as_view(), name="inventory-summary"),
 ]
+
+if settings.ASYNC_VIEWS:
+    # an open event stream needs the ASGI server's event loop
+    urlpatterns.append(path("events/", ProductEventsView.as_view(), name="inventory-events"))
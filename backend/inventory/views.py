@@ -1,32 +1,88 @@
+import asyncio
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from organizations.permissions import CanManageInventory
+from techapp.async_views import AsyncAPIView, AsyncListView, AsyncRetrieveView
+from techapp.conditional import ConditionalGetMixin
+from techapp.events import get_backend
+from techapp.fieldsets import SparseFieldsetMixin
+from techapp.values import ValuesListMixin, ValuesSerializer
+from .bulk import remove_products, update_products
 from .models import Product
-from .serializers import ProductSerializer
+from .events import organization_group, products_changed
+from .exporters import CSVRenderer, NDJSONRenderer, aiterate, stream_csv, stream_ndjson
+from .importers import ImportFileError, import_products, read_rows
+from .filters import ProductFilter, ProductOrderingFilter, ProductSearchFilter
+from .pagination import ProductCursorPagination
+from .serializers import (
+    InventorySummarySerializer, ProductBulkUpdateSerializer, ProductSelectionSerializer, ProductSerializer,
+    StockMovementSerializer,
+)
+from .stock import apply_movements
+from .sync import changes_since, delete_products
 
 
-class ProductListCreateView(generics.ListCreateAPIView):
+class ProductListCreateView(ConditionalGetMixin, SparseFieldsetMixin, ValuesListMixin, generics.ListCreateAPIView):
+    """Products of the current organization; GET takes ``?fields=`` / ``?omit=`` (see ``techapp/fieldsets.py``)."""
     serializer_class = ProductSerializer
+    # GET reads rows with .values(); output is ProductSerializer's
+    values_serializer = ValuesSerializer(ProductSerializer)
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ProductCursorPagination
+    filter_backends = [ProductFilter, ProductSearchFilter, ProductOrderingFilter]
 
     def get_queryset(self):
-        user = self.request.user
-        org = getattr(user, "current_org", None)
-        return Product.objects.filter(organization=org)
+        return Product.objects.filter(organization_id=self.request.user.current_org_id).with_total_value()
+
+    def get_validators(self):
+        # Any create or update moves max(updated_at) and any delete moves the
+        # count. No Last-Modified: a delete leaves max(updated_at) unchanged.
+        org_id = self.request.user.current_org_id
+        state = Product.objects.filter(organization_id=org_id).aggregate(
+            last_updated=Max("updated_at"), count=Count("id")
+        )
+        return (org_id, state["last_updated"], state["count"], self.request.GET.urlencode()), None
 
     def perform_create(self, serializer):
         user = self.request.user
-        org = getattr(user, "current_org", None)
-        serializer.save(created_by=user, organization=org)
+        product = serializer.save(created_by_id=user.pk, organization_id=user.current_org_id)
+        products_changed(product.organization_id, "created", [product.pk])
 
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProductDetailView(ConditionalGetMixin, SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        org = getattr(user, "current_org", None)
-        return Product.objects.filter(organization=org)
+        queryset = Product.objects.filter(organization_id=self.request.user.current_org_id)
+        if self.request.method in ("GET", "HEAD"):
+            # total_value from the database, so .only() can leave quantity and unit_price out
+            queryset = queryset.with_total_value()
+        return queryset
+
+    def get_validators(self):
+        updated_at = self.get_queryset().filter(pk=self.kwargs["pk"]).values_list("updated_at", flat=True).first()
+        if updated_at is None:
+            return None, None
+        return (self.kwargs["pk"], updated_at.isoformat(), self.get_fieldset()), updated_at
+
+    def perform_update(self, serializer):
+        product = serializer.save()
+        products_changed(product.organization_id, "updated", [product.pk])
+
+    def perform_destroy(self, instance):
+        # leaves a tombstone for delta-sync clients
+        delete_products([instance])
 
     def update(self, request, *args, **kwargs):
         if not request.user.is_superuser and "unit_price" in request.data:
@@ -35,3 +91,263 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         return super().update(request, *args, **kwargs)
+
+
+class ProductBulkView(generics.GenericAPIView):
+    """
+    Change or delete many products in one request. Select them by ``ids``
+    in the body, by the product list's filters as query parameters
+    (``?category=food&search=rice``), or both:
+
+    PATCH ``{"ids": [1, 2], "changes": {"supplier_name": "Acme"}}``
+    DELETE ``{"ids": [1, 2]}``
+
+    Changes are validated once with ProductSerializer's rules and applied
+    in one transaction (see ``inventory/bulk.py``).
+    """
+    permission_classes = [permissions.IsAuthenticated, CanManageInventory]
+    filter_backends = [ProductFilter, ProductSearchFilter]
+    filter_params = (*ProductFilter.params, ProductSearchFilter.search_param)
+
+    def get_queryset(self):
+        return Product.objects.filter(organization_id=self.request.user.current_org_id)
+
+    def get_selection(self, ids):
+        if ids is None and not any(self.request.query_params.get(name) for name in self.filter_params):
+            # never "every product" by omission
+            raise ValidationError({"ids": "Give ids or filter the products."})
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset if ids is None else queryset.filter(pk__in=ids)
+
+    def patch(self, request):
+        changes = request.data.get("changes") if isinstance(request.data, dict) else None
+        if not request.user.is_superuser and isinstance(changes, dict) and "unit_price" in changes:
+            return Response(
+                {"detail": "Only superusers can update product prices."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = ProductBulkUpdateSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        ids = update_products(
+            self.get_selection(serializer.validated_data.get("ids")),
+            serializer.validated_data["changes"],
+            organization_id=request.user.current_org_id,
+        )
+        return Response({"updated": len(ids), "ids": ids})
+
+    def delete(self, request):
+        serializer = ProductSelectionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = remove_products(self.get_selection(serializer.validated_data.get("ids")))
+        return Response({"deleted": len(ids), "ids": ids})
+
+
+class ProductChangesView(SparseFieldsetMixin, generics.GenericAPIView):
+    """
+    Delta sync for offline clients: ``GET ?since=<token>`` returns the
+    products created or updated since the token, the ids deleted since, and
+    the ``next`` token. Without ``since`` every product is returned. Follow
+    ``next`` while ``has_more`` is true. See ``inventory/sync.py``.
+    ``?fields=`` / ``?omit=`` trim the products; ``id`` is always kept, as
+    clients apply the changes by id.
+    """
+    serializer_class = ProductSerializer
+    # the next token is built from the last product's updated_at
+    required_columns = ("updated_at",)
+    required_fields = ("id",)
+    permission_classes = [permissions.IsAuthenticated]
+    page_size = 500
+    max_page_size = 2000
+
+    def get(self, request):
+        org_id = request.user.current_org_id
+        try:
+            limit = min(int(request.query_params.get("page_size", self.page_size)), self.max_page_size)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({"page_size": "A positive whole number is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = changes_since(
+            self.prune_queryset(Product.objects.filter(organization_id=org_id).with_total_value()),
+            organization_id=org_id,
+            token=request.query_params.get("since"),
+            limit=limit,
+        )
+        changes["products"] = self.get_serializer(changes["products"], many=True).data
+        return Response(changes)
+
+
+class ProductEventsView(AsyncAPIView):
+    """
+    Server-sent events of the organization's product changes (see
+    ``inventory/events.py``), so dashboards stop polling the product list.
+    ASGI only. Each event names the changed products; on ``resync``, or
+    after reconnecting, clients catch up through ``ProductChangesView``.
+    """
+    # same authentication and permissions; other methods get its 405
+    sync_view = ProductChangesView
+    heartbeat = 20
+
+    async def get(self, request):
+        subscription = get_backend().subscribe(organization_group(request.user.current_org_id))
+        return StreamingHttpResponse(
+            self.stream(subscription),
+            content_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def stream(self, subscription):
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    # keeps proxies and mobile networks from dropping an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            subscription.close()
+
+
+class AsyncProductListView(AsyncListView):
+    """Product list GET with the async ORM; POST goes to ``ProductListCreateView``."""
+    sync_view = ProductListCreateView
+
+
+class AsyncProductDetailView(AsyncRetrieveView):
+    """Product GET with the async ORM; writes go to ``ProductDetailView``."""
+    sync_view = ProductDetailView
+
+
+class InventorySummaryView(APIView):
+    """
+    Org-wide stock valuation for the dashboard, aggregated in the database.
+    ``?low_stock=<n>`` sets the quantity at or below which a product counts
+    as low stock (default 5).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            threshold = int(request.query_params.get("low_stock", 5))
+        except ValueError:
+            return Response({"detail": "low_stock must be a whole number."}, status=400)
+
+        labels = dict(Product.CATEGORY_CHOICES)
+        categories = [
+            {**row, "label": labels.get(row["category"], row["category"])}
+            for row in Product.objects.filter(organization_id=request.user.current_org_id).category_summary(threshold)
+        ]
+        summary = {
+            "product_count": sum(c["product_count"] for c in categories),
+            "total_quantity": sum(c["total_quantity"] for c in categories),
+            "total_value": sum((c["total_value"] for c in categories), Decimal("0.00")),
+            "low_stock_count": sum(c["low_stock_count"] for c in categories),
+            "categories": categories,
+        }
+        return Response(InventorySummarySerializer(summary).data)
+
+
+class ProductImportView(APIView):
+    """
+    Bulk-create products from an uploaded CSV or XLSX (multipart field
+    ``file``; the header row holds ProductSerializer field names).
+
+    Optional form fields: ``batch_size`` (rows per INSERT) and ``strict``
+    (roll back everything if any row is invalid).
+    """
+    permission_classes = [permissions.IsAuthenticated, CanManageInventory]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"detail": "A CSV or XLSX file is required."}, status=400)
+
+        try:
+            batch_size = int(request.data.get("batch_size", settings.INVENTORY_IMPORT_BATCH_SIZE))
+        except ValueError:
+            return Response({"detail": "batch_size must be a whole number."}, status=400)
+        batch_size = max(1, min(batch_size, settings.INVENTORY_IMPORT_MAX_BATCH_SIZE))
+        strict = str(request.data.get("strict", "")).lower() in ("1", "true", "yes")
+
+        try:
+            result = import_products(
+                read_rows(upload),
+                request=request,
+                organization_id=request.user.current_org_id,
+                batch_size=batch_size,
+                strict=strict,
+            )
+        except ImportFileError as exc:
+            return Response({"detail": str(exc)}, status=400)
+
+        if strict and result["error_count"]:
+            return Response(result, status=400)
+        return Response(result, status=status.HTTP_201_CREATED if result["created"] else 200)
+
+
+class ProductExportView(generics.GenericAPIView):
+    """
+    Stream the organization's catalogue as CSV (default, ``?format=csv``) or
+    NDJSON (``?format=ndjson``). Accepts the same filters as the product
+    list. Rows are read through a server-side cursor and written out as they
+    arrive, so memory use does not grow with the catalogue; under ASGI the
+    response gets an async iterator (``exporters.aiterate``) so it streams
+    there too.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    filter_backends = [ProductFilter, ProductSearchFilter, ProductOrderingFilter]
+
+    def get_queryset(self):
+        org_id = self.request.user.current_org_id
+        return Product.objects.filter(organization_id=org_id).with_total_value().order_by("id")
+
+    def get(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        chunk_size = settings.INVENTORY_EXPORT_CHUNK_SIZE
+        if request.accepted_renderer.format == "ndjson":
+            lines = stream_ndjson(queryset, chunk_size)
+            content_type, filename = "application/x-ndjson", "products.ndjson"
+        else:
+            lines = stream_csv(queryset, chunk_size)
+            content_type, filename = "text/csv; charset=utf-8", "products.csv"
+        if isinstance(request._request, ASGIRequest):
+            lines = aiterate(lines, chunk_size)
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class StockAdjustView(APIView):
+    """
+    Apply stock movements atomically. Accepts one movement, a list, or
+    ``{"movements": [...]}``; each movement is
+    ``{"product": id, "kind": "receipt|sale|adjustment|return", "change": n, "note": ""}``
+    with ``change`` signed (negative for sales). Either every movement is
+    applied or none is.
+    """
+    permission_classes = [permissions.IsAuthenticated, CanManageInventory]
+
+    def post(self, request):
+        data = request.data
+        if isinstance(data, dict):
+            data = data.get("movements", [data])
+        serializer = StockMovementSerializer(data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+        if not serializer.validated_data:
+            return Response({"detail": "No movements given."}, status=400)
+
+        entries = apply_movements(
+            serializer.validated_data,
+            organization_id=request.user.current_org_id,
+            user=request.user,
+        )
+        return Response(
+            StockMovementSerializer(entries, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,105 @@
+# organizations/access.py
+"""
+Per-user authorization context: the user's organization, role and
+``can_*`` flags, resolved once per request and cached between requests.
+
+Cache entries are keyed by user and stamped with a per-organization
+version, so a save to the Organization invalidates every member at once;
+Membership saves drop the member's own entry (see ``signals.py``). With the
+default per-process cache, other workers can serve a stale entry for up to
+``ACCESS_TIMEOUT`` seconds; configure a shared cache to make invalidation
+global.
+"""
+import time
+
+from django.core.cache import cache
+
+from .models import Membership
+
+ACCESS_TIMEOUT = 300
+
+PERMISSION_FLAGS = tuple(
+    f.name for f in Membership._meta.get_fields() if f.name.startswith("can_")
+)
+
+
+class OrgAccess:
+    def __init__(self, user_id, org_id, role=None, flags=None):
+        self.user_id = user_id
+        self.org_id = org_id
+        self.role = role
+        self.flags = flags or {}
+
+    @property
+    def is_member(self):
+        return self.role is not None
+
+    @property
+    def is_owner(self):
+        return self.role == Membership.Role.OWNER
+
+    def can(self, flag):
+        return self.flags.get(flag, False)
+
+
+def _access_key(user_id):
+    return f"org-access:{user_id}"
+
+
+def _version_key(org_id):
+    return f"org-access-version:{org_id}"
+
+
+def _org_version(org_id):
+    return cache.get_or_set(_version_key(org_id), time.time_ns, None)
+
+
+def load_access(user):
+    """Build the ``OrgAccess`` for ``user`` from the database (one query)."""
+    membership = (
+        Membership.objects.filter(user_id=user.pk, organization_id=user.current_org_id)
+        .values("role", *PERMISSION_FLAGS)
+        .first()
+    )
+    if membership is None:
+        return OrgAccess(user.pk, user.current_org_id)
+    role = membership.pop("role")
+    return OrgAccess(user.pk, user.current_org_id, role, membership)
+
+
+def get_access(request):
+    """
+    Return the ``OrgAccess`` for ``request.user``. Memoized on the request,
+    so any number of permission checks cost at most one query, and none on
+    a cache hit.
+    """
+    access = getattr(request, "_org_access", None)
+    if access is not None:
+        return access
+
+    user = request.user
+    # stateless token users carry their access in the token claims
+    access = getattr(user, "org_access", None)
+    if access is not None:
+        request._org_access = access
+        return access
+
+    if user.current_org_id is None:
+        access = OrgAccess(user.pk, None)
+    else:
+        version = _org_version(user.current_org_id)
+        access = cache.get(_access_key(user.pk), version=version)
+        if access is None or access.org_id != user.current_org_id:
+            access = load_access(user)
+            cache.set(_access_key(user.pk), access, ACCESS_TIMEOUT, version=version)
+
+    request._org_access = access
+    return access
+
+
+def invalidate_user(user_id, org_id):
+    cache.delete(_access_key(user_id), version=_org_version(org_id))
+
+
+def invalidate_organization(org_id):
+    cache.set(_version_key(org_id), time.time_ns(), None)
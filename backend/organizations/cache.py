@@ -0,0 +1,29 @@
+# organizations/cache.py
+"""
+Cached organization profiles (``/api/organizations/profile/``): name,
+preferences, owner username and timestamps, read through
+``techapp.cache.TieredCache``. Organization saves drop the entry, and so do
+saves of a user whose ``current_org`` it is, since the owner's username is
+part of it (``signals.py``).
+"""
+from techapp.cache import TieredCache
+from .models import Organization
+
+PROFILE_FIELDS = ("name", "preference", "owner__username", "created_at", "updated_at")
+
+profile_cache = TieredCache("org-profile")
+
+
+def _profiles(org_id):
+    return Organization.objects.filter(pk=org_id).values(*PROFILE_FIELDS)
+
+
+def organization_profile(org_id):
+    """The profile dict of organization ``org_id``, or ``None`` if there is none."""
+    if org_id is None:
+        return None
+    return profile_cache.get_or_set(org_id, lambda: _profiles(org_id).first())
+
+
+def forget_organization(*org_ids):
+    profile_cache.delete(*org_ids)
@@ -0,0 +1,110 @@
+# organizations/management/commands/benchmark.py
+"""
+Replay a realistic request mix against tenants made by ``seed_tenants``.
+
+    python manage.py seed_tenants --orgs 20 --products 500
+    python manage.py benchmark --requests 5000 --concurrency 4
+
+Reports requests, errors, throughput and p50/p95/p99 latency per scenario;
+``--json`` also writes them to a file so runs before and after a change
+can be compared. The run writes to the database (product create/update).
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.models import Product
+from organizations.models import Membership
+from organizations.management.commands.seed_tenants import synthetic_users
+from techapp import benchmark
+
+
+def default_host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host and "*" not in host]
+    return hosts[0].lstrip(".") if hosts else "localhost"
+
+
+class Command(BaseCommand):
+    help = "Benchmark the API in-process with a weighted mix of requests from synthetic tenants."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="bench", help="Prefix the tenants were seeded with.")
+        parser.add_argument("--password", default="bench-pass-123")
+        parser.add_argument("--requests", type=int, default=2000, help="Measured requests.")
+        parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests run first.")
+        parser.add_argument("--concurrency", type=int, default=1, help="Worker threads.")
+        parser.add_argument(
+            "--mix", default="",
+            help="Scenarios and weights, e.g. 'me=3,product-list=6'. "
+                 f"Default: {','.join(f'{name}={mix[0]}' for name, mix in benchmark.DEFAULT_MIX.items())}.",
+        )
+        parser.add_argument("--users", type=int, default=200, help="Most seeded users to sign in as.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--host", default=None, help="Host header to send; must be in ALLOWED_HOSTS.")
+        parser.add_argument("--json", dest="json_path", help="Also write the results to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            mix = benchmark.parse_mix(options["mix"]) if options["mix"] else benchmark.DEFAULT_MIX
+        except ValueError as exc:
+            raise CommandError(exc)
+        if options["concurrency"] < 1 or options["requests"] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+
+        sessions = self.load_sessions(options)
+        host = options["host"] or default_host()
+        benchmark.sign_in(sessions, host)
+
+        self.stdout.write(
+            f"{options['requests']} requests, {options['concurrency']} threads, "
+            f"{len(sessions)} users in {len({s.organization_id for s in sessions})} tenants"
+        )
+        samples, elapsed = benchmark.run(
+            sessions, mix,
+            requests=options["requests"], concurrency=options["concurrency"],
+            warmup=options["warmup"], seed=options["seed"], host=host,
+        )
+        rows = benchmark.summarize(samples, elapsed)
+
+        self.stdout.write(f"{'scenario':<16}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, row in rows.items():
+            self.stdout.write(
+                f"{name:<16}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10.1f}"
+                f"{row['p50']:>10.1f}{row['p95']:>10.1f}{row['p99']:>10.1f}"
+            )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump({"options": {k: options[k] for k in ("requests", "concurrency", "mix", "seed")},
+                           "elapsed": elapsed, "results": rows}, fh, indent=2)
+        if rows["all"]["errors"]:
+            self.stderr.write(self.style.WARNING(f"{rows['all']['errors']} requests failed."))
+
+    def load_sessions(self, options):
+        memberships = (
+            Membership.objects
+            .filter(user__in=synthetic_users(options["prefix"]))
+            .select_related("user")
+            .order_by("organization_id", "user_id")[:options["users"]]
+        )
+        product_ids = {}
+        for org_id, product_id in (
+            Product.objects.filter(organization_id__in={m.organization_id for m in memberships})
+            .values_list("organization_id", "id")
+        ):
+            product_ids.setdefault(org_id, []).append(product_id)
+
+        sessions = [
+            benchmark.Session(
+                m.user.username, options["password"], m.organization_id, m.role == Membership.Role.OWNER,
+                product_ids.get(m.organization_id, []),
+            )
+            for m in memberships
+            if product_ids.get(m.organization_id)
+        ]
+        if not any(session.is_owner for session in sessions):
+            raise CommandError(
+                f"No tenants with prefix '{options['prefix']}'; run 'manage.py seed_tenants' first."
+            )
+        return sessions
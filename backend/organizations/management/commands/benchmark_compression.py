@@ -0,0 +1,85 @@
+# organizations/management/commands/benchmark_compression.py
+"""
+Measure transfer sizes with and without response compression.
+
+    python manage.py seed_tenants --orgs 20 --products 500
+    python manage.py benchmark_compression --repeat 10
+
+Signs in as the owner of the seeded tenant with the most products and
+fetches product list pages and the streamed exports through the whole
+middleware stack, once per ``Accept-Encoding``. Reports the bytes sent and
+the median response time (including compression) of ``--repeat`` runs.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+
+from organizations.models import Membership
+from organizations.management.commands.benchmark import default_host
+from organizations.management.commands.seed_tenants import synthetic_users
+from techapp import benchmark
+from techapp.compression import brotli
+
+ENCODINGS = ("identity", "gzip", "br")
+
+TARGETS = {
+    "list, 50 rows": "/api/inventory/products/?page_size=50",
+    "list, 500 rows": "/api/inventory/products/?page_size=500",
+    "list, 500 rows, ?fields=": (
+        "/api/inventory/products/?page_size=500"
+        "&fields=id,name,model,serial_number,quantity,unit_price,total_value,supplier_name,date_supplied"
+    ),
+    "export, CSV": "/api/inventory/products/export/?format=csv",
+    "export, NDJSON": "/api/inventory/products/export/?format=ndjson",
+}
+
+
+def body(response):
+    return b"".join(response.streaming_content) if response.streaming else response.content
+
+
+class Command(BaseCommand):
+    help = "Compare response sizes and times without compression, with gzip and with brotli."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="bench", help="Prefix the tenants were seeded with.")
+        parser.add_argument("--password", default="bench-pass-123")
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--host", default=None, help="Host header to send; must be in ALLOWED_HOSTS.")
+
+    def handle(self, *args, **options):
+        owner = (
+            Membership.objects
+            .filter(user__in=synthetic_users(options["prefix"]), role=Membership.Role.OWNER)
+            .annotate(products=Count("organization__inventory_products"))
+            .select_related("user")
+            .order_by("-products")
+            .first()
+        )
+        if owner is None:
+            raise CommandError(f"No tenants with prefix '{options['prefix']}'; run 'manage.py seed_tenants' first.")
+        encodings = ENCODINGS if brotli is not None else ENCODINGS[:2]
+
+        host = options["host"] or default_host()
+        session = benchmark.Session(owner.user.username, options["password"], owner.organization_id, True, [])
+        benchmark.sign_in([session], host)
+        client = Client(SERVER_NAME=host)
+
+        self.stdout.write(f"{owner.products} products, median of {options['repeat']} runs")
+        self.stdout.write(f"{'target':<28}" + "".join(f"{encoding + ' KiB':>14}{'ms':>8}" for encoding in encodings))
+        for name, url in TARGETS.items():
+            line = f"{name:<28}"
+            for encoding in encodings:
+                sizes, timings = [], []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    response = client.get(url, HTTP_AUTHORIZATION=session.authorization, HTTP_ACCEPT_ENCODING=encoding)
+                    sizes.append(len(body(response)))
+                    timings.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        raise CommandError(f"{url} answered {response.status_code}.")
+                line += f"{statistics.median(sizes) / 1024:>14.1f}{statistics.median(timings) * 1000:>8.1f}"
+            self.stdout.write(line)
@@ -0,0 +1,92 @@
+# organizations/management/commands/benchmark_connections.py
+"""
+Compare database connection strategies on the same request mix.
+
+    python manage.py seed_tenants --orgs 20 --products 500
+    python manage.py benchmark_connections --requests 1000 --concurrency 4
+
+Runs ``manage.py benchmark`` once per mode, each in a fresh process with
+the environment below, and prints the overall throughput and latency side
+by side:
+
+``fresh``       a new connection per request (``DB_CONN_MAX_AGE=0``)
+``persistent``  one connection per thread, kept between requests
+``pool``        a psycopg pool per process (``DB_POOL=True``)
+
+The gap between ``fresh`` and the others is the connection setup cost
+(TCP, TLS and authentication), which grows with the distance to the
+database server.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+MODES = {
+    "fresh": {"DB_POOL": "False", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL": "False", "DB_CONN_MAX_AGE": "600"},
+    "pool": {"DB_POOL": "True"},
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-request, persistent and pooled database connections against each other."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated, from: {', '.join(MODES)}.")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument(
+            "--mix", default="me=1,profile=1,product-list=3,product-update=1",
+            help="Request mix passed to the benchmark command (sign-in is left out: password hashing would dominate).",
+        )
+        parser.add_argument("--users", type=int, default=20, help="Seeded users to sign in as (each sign-in hashes a password).")
+        parser.add_argument("--prefix", default="bench")
+        parser.add_argument("--host", default=None)
+        parser.add_argument("--json", dest="json_path", help="Also write the results to this file.")
+
+    def handle(self, *args, **options):
+        modes = [mode for mode in options["modes"].split(",") if mode]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))}. Choose from: {', '.join(MODES)}.")
+
+        results = {}
+        for mode in modes:
+            self.stdout.write(f"{mode}...")
+            results[mode] = self.run_mode(mode, options)
+
+        self.stdout.write(f"{'mode':<12}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for mode, row in results.items():
+            self.stdout.write(
+                f"{mode:<12}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10.1f}"
+                f"{row['p50']:>10.1f}{row['p95']:>10.1f}{row['p99']:>10.1f}"
+            )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump(results, fh, indent=2)
+
+    def run_mode(self, mode, options):
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            command = [
+                sys.executable, str(settings.BASE_DIR / "manage.py"), "benchmark",
+                "--requests", str(options["requests"]), "--warmup", str(options["warmup"]),
+                "--concurrency", str(options["concurrency"]), "--mix", options["mix"],
+                "--users", str(options["users"]), "--prefix", options["prefix"], "--json", output.name,
+            ]
+            if options["host"]:
+                command += ["--host", options["host"]]
+            # the child reads its settings afresh, so the mode's variables win
+            completed = subprocess.run(
+                command, env={**os.environ, **MODES[mode]}, capture_output=True, text=True,
+            )
+            if completed.returncode != 0:
+                raise CommandError(f"{mode} run failed:\n{completed.stderr}")
+            with open(output.name) as fh:
+                return json.load(fh)["results"]["all"]
@@ -0,0 +1,92 @@
+# organizations/management/commands/benchmark_json.py
+"""
+Time JSON encoding and decoding of large product lists.
+
+    python manage.py benchmark_json --products 1000 --repeat 20
+
+Builds ``--products`` unsaved products, serializes them with
+``ProductSerializer`` and with the list view's ``ValuesSerializer``, then
+renders the page with DRF's
+``JSONRenderer`` and with ``ORJSONRenderer`` and parses it back with each
+parser, reporting the median of ``--repeat`` runs. Serialization is timed
+too, to show what share of the response time encoding takes. No database
+access.
+"""
+import io
+import statistics
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from inventory.models import Product
+from inventory.serializers import ProductSerializer
+from inventory.views import ProductListCreateView
+from techapp.fastjson import ORJSONParser, ORJSONRenderer
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = "Compare the stdlib and orjson JSON renderers and parsers on a large product list."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        products = [
+            Product(
+                id=n, organization_id=1, created_by_id=1, name=f"Product {n} — ünïcode",
+                model=f"M-{n}", serial_number=f"SN-{n:08d}", category="electronics",
+                quantity=n % 500, unit_price=Decimal("1999.99") + n, supplier_name="Supplier Ltd",
+                supplier_email="supplier@example.com", date_supplied=date(2024, 1, 1 + n % 28),
+                created_at=now, updated_at=now,
+            )
+            for n in range(options["products"])
+        ]
+        for product in products:
+            # what the list queryset annotates
+            product.total_value = product.unit_price * product.quantity
+        repeat = options["repeat"]
+
+        # what .values() hands ValuesSerializer for the same rows
+        values = ProductListCreateView.values_serializer
+        value_rows = [
+            {lookup: getattr(product, Product._meta.get_field(lookup).attname if lookup != "total_value" else lookup)
+             for lookup in values.lookups}
+            for product in products
+        ]
+
+        page = {"next": None, "previous": None, "results": ProductSerializer(products, many=True).data}
+        body = JSONRenderer().render(page)
+        rows = [
+            ("serialize (ProductSerializer)", median_ms(lambda: ProductSerializer(products, many=True).data, repeat)),
+            ("serialize (ValuesSerializer)", median_ms(lambda: values.represent(value_rows), repeat)),
+            ("render: JSONRenderer", median_ms(lambda: JSONRenderer().render(page), repeat)),
+            ("render: ORJSONRenderer", median_ms(lambda: ORJSONRenderer().render(page), repeat)),
+            ("parse: JSONParser", median_ms(lambda: JSONParser().parse(io.BytesIO(body)), repeat)),
+            ("parse: ORJSONParser", median_ms(lambda: ORJSONParser().parse(io.BytesIO(body)), repeat)),
+        ]
+
+        self.stdout.write(f"{options['products']} products, {len(body) / 1024:.0f} KiB, median of {repeat} runs")
+        for name, ms in rows:
+            self.stdout.write(f"{name:<32}{ms:>10.2f} ms")
+        serialize, values_serialize, stdlib, fast = (ms for _, ms in rows[:4])
+        self.stdout.write(
+            f"encoding share of serialize+render: {stdlib / (serialize + stdlib):.0%} stdlib, "
+            f"{fast / (serialize + fast):.0%} orjson"
+        )
+        self.stdout.write(f"ValuesSerializer: {serialize / values_serialize:.0f}x faster than ProductSerializer")
@@ -0,0 +1,157 @@
+# organizations/management/commands/seed_tenants.py
+"""
+Generate synthetic tenants for load testing.
+
+    python manage.py seed_tenants --orgs 50 --members 10 --products 500
+
+Creates ``--orgs`` organizations, each with an owner, ``--members`` staff
+memberships and a skewed number of products averaging ``--products``: a
+few tenants are large and most are small, like real traffic. The same
+``--seed`` always produces the same data. Every user can sign in with
+``--password``; usernames are ``<prefix>-<n>-owner`` and
+``<prefix>-<n>-staff<m>``.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from inventory.models import Product
+from organizations.models import Membership, Organization
+from users.models import User
+
+EMAIL_DOMAIN = "loadtest.invalid"
+SUPPLIERS = ["Acme Supplies", "Global Traders", "Sunrise Imports", "Delta Wholesale", "Prime Distributors"]
+
+
+def synthetic_users(prefix):
+    """Users created by this command for ``prefix``."""
+    return User.objects.filter(username__startswith=f"{prefix}-", email__endswith=f"@{EMAIL_DOMAIN}")
+
+
+def skewed_sizes(rng, count, mean, alpha):
+    """``count`` Pareto-distributed sizes of at least 1 that add up to about ``count * mean``."""
+    weights = [rng.paretovariate(alpha) for _ in range(count)]
+    scale = count * mean / sum(weights)
+    return [max(1, round(weight * scale)) for weight in weights]
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic organizations, memberships and products for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orgs", type=int, default=10, help="Organizations to create.")
+        parser.add_argument("--members", type=int, default=5, help="Staff memberships per organization.")
+        parser.add_argument("--products", type=int, default=200, help="Average products per organization.")
+        parser.add_argument(
+            "--skew", type=float, default=1.16,
+            help="Pareto shape of the product counts; lower is more skewed (1.16 is roughly 80/20).",
+        )
+        parser.add_argument("--prefix", default="bench", help="Prefix of every generated username.")
+        parser.add_argument("--password", default="bench-pass-123", help="Password of every generated user.")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--flush", action="store_true",
+            help="Delete the tenants previously generated with this prefix first.",
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if options["orgs"] < 1 or options["members"] < 0 or options["products"] < 1:
+            raise CommandError("--orgs and --products must be at least 1 and --members at least 0.")
+
+        with transaction.atomic():
+            existing = synthetic_users(prefix)
+            if options["flush"]:
+                deleted, _ = existing.delete()
+                self.stdout.write(f"Deleted {deleted} rows from earlier '{prefix}' tenants.")
+            elif existing.exists():
+                raise CommandError(f"Tenants with prefix '{prefix}' already exist; use --flush or another --prefix.")
+
+            counts = self.generate(options)
+
+        self.stdout.write(self.style.SUCCESS(
+            "Created {orgs} organizations, {users} users and {products} products "
+            "(largest tenant: {largest} products).".format(**counts)
+        ))
+
+    def generate(self, options):
+        rng = random.Random(options["seed"])
+        prefix = options["prefix"]
+        batch_size = options["batch_size"]
+        password = make_password(options["password"])
+        sizes = skewed_sizes(rng, options["orgs"], options["products"], options["skew"])
+
+        owners = User.objects.bulk_create([
+            User(
+                username=f"{prefix}-{n}-owner", email=f"{prefix}-{n}-owner@{EMAIL_DOMAIN}",
+                password=password, company_name=f"{prefix.title()} Org {n}",
+                is_superuser=True, is_staff=True,
+            )
+            for n in range(options["orgs"])
+        ], batch_size=batch_size)
+        orgs = Organization.objects.bulk_create([
+            Organization(name=owner.company_name, owner=owner, preference=["commerce"])
+            for owner in owners
+        ], batch_size=batch_size)
+        for owner, org in zip(owners, orgs):
+            owner.current_org = org
+        User.objects.bulk_update(owners, ["current_org"], batch_size=batch_size)
+
+        staff = User.objects.bulk_create([
+            User(
+                username=f"{prefix}-{n}-staff{m}", email=f"{prefix}-{n}-staff{m}@{EMAIL_DOMAIN}",
+                password=password, company_name=org.name, current_org=org,
+            )
+            for n, org in enumerate(orgs)
+            for m in range(options["members"])
+        ], batch_size=batch_size)
+
+        memberships = [
+            Membership(
+                user=owner, organization=org, role=Membership.Role.OWNER, can_edit_preference=True,
+                can_manage_users=True, can_manage_inventory=True, can_manage_sales=True,
+                can_manage_services=True, can_view_reports=True, can_create_customers=True,
+            )
+            for owner, org in zip(owners, orgs)
+        ]
+        memberships += [
+            Membership(
+                user=user, organization=user.current_org, role=Membership.Role.STAFF,
+                can_manage_inventory=True, can_manage_sales=True,
+            )
+            for user in staff
+        ]
+        Membership.objects.bulk_create(memberships, batch_size=batch_size)
+
+        categories = [choice[0] for choice in Product.CATEGORY_CHOICES]
+        today = date.today()
+        batch = []
+        for n, (owner, org, size) in enumerate(zip(owners, orgs, sizes)):
+            for i in range(size):
+                batch.append(Product(
+                    organization=org, created_by=owner,
+                    name=f"{rng.choice(['Laptop', 'Printer', 'Router', 'Monitor', 'Cable', 'Scanner'])} {n}-{i}",
+                    model=f"M{rng.randint(100, 999)}",
+                    serial_number=f"{prefix}-{n}-{i}",
+                    category=rng.choice(categories),
+                    quantity=rng.choice([0, 1, 3, 5]) if rng.random() < 0.1 else rng.randint(6, 500),
+                    unit_price=Decimal(rng.randint(100, 500000)) / 100,
+                    supplier_name=rng.choice(SUPPLIERS),
+                    date_supplied=today - timedelta(days=rng.randint(0, 365)),
+                ))
+                if len(batch) >= batch_size:
+                    Product.objects.bulk_create(batch)
+                    batch = []
+        Product.objects.bulk_create(batch)
+
+        return {
+            "orgs": len(orgs),
+            "users": len(owners) + len(staff),
+            "products": sum(sizes),
+            "largest": max(sizes),
+        }
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0006_alter_organization_preference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
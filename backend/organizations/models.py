@@ -31,6 +31,7 @@ class Organization(models.Model):
         related_name="owned_organization"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
@@ -0,0 +1,47 @@
+from rest_framework import permissions
+
+from .access import get_access
+
+
+class OrgPermission(permissions.BasePermission):
+    """
+    Grants access to superusers and to members of the user's current
+    organization whose Membership has ``flag`` set. Subclasses set ``flag``.
+    """
+    flag = None
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        if user.is_superuser:
+            return True
+        return get_access(request).can(self.flag)
+
+
+class IsOrgOwner(permissions.BasePermission):
+    message = "Only organization owners can do this."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and get_access(request).is_owner)
+
+
+class CanManageUsers(OrgPermission):
+    flag = "can_manage_users"
+    message = "You do not have permission to manage users."
+
+
+class CanManageInventory(OrgPermission):
+    flag = "can_manage_inventory"
+    message = "You do not have permission to manage inventory."
+
+
+class CanManageSales(OrgPermission):
+    flag = "can_manage_sales"
+    message = "You do not have permission to manage sales."
+
+
+class CanViewReports(OrgPermission):
+    flag = "can_view_reports"
+    message = "You do not have permission to view reports."
@@ -0,0 +1,129 @@
+# organizations/provisioning.py
+"""
+Bulk staff onboarding (``/api/organizations/add-staff/bulk/``).
+
+``provision_staff`` validates every row with ``StaffCreateSerializer``
+rules, checks all usernames and emails against the users table in one
+query, hashes the passwords on a thread pool (PBKDF2 releases the GIL) and
+inserts the users and their memberships with ``bulk_create`` in one
+transaction. Any invalid row rejects the whole batch, so a file can be
+fixed and sent again; so does a username or email taken by a concurrent
+request between the check and the insert.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from users.models import User
+from .access import PERMISSION_FLAGS
+from .models import Membership
+from .serializers import StaffCreateSerializer
+
+
+class StaffBatchError(Exception):
+    """The batch was rejected; ``errors`` lists ``{"row": n, "errors": {...}}``."""
+
+    def __init__(self, errors):
+        self.errors = errors
+
+
+def hash_passwords(passwords):
+    workers = settings.STAFF_PROVISIONING_HASH_WORKERS
+    if workers <= 1 or len(passwords) <= 1:
+        return [make_password(password) for password in passwords]
+    with ThreadPoolExecutor(max_workers=min(workers, len(passwords))) as pool:
+        return list(pool.map(make_password, passwords))
+
+
+def _validate(rows):
+    staff, errors = [], []
+    usernames, emails = {}, {}
+    for line, row in enumerate(rows, start=1):
+        serializer = StaffCreateSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({"row": line, "errors": serializer.errors})
+            continue
+        data = serializer.validated_data
+        data["email"] = User.objects.normalize_email(data["email"])
+        duplicate = {}
+        if data["username"] in usernames:
+            duplicate["username"] = f"Repeats row {usernames[data['username']]}."
+        if data["email"].lower() in emails:
+            duplicate["email"] = f"Repeats row {emails[data['email'].lower()]}."
+        if duplicate:
+            errors.append({"row": line, "errors": duplicate})
+            continue
+        usernames[data["username"]] = emails[data["email"].lower()] = line
+        staff.append((line, data))
+    return staff, errors
+
+
+def _taken(staff):
+    """Rows whose username or email is already in use, from one ``IN`` query."""
+    usernames = [data["username"] for _, data in staff]
+    emails = [data["email"] for _, data in staff]
+    taken_usernames, taken_emails = set(), set()
+    for username, email in User.objects.filter(
+        Q(username__in=usernames) | Q(email__in=emails)
+    ).values_list("username", "email"):
+        taken_usernames.add(username)
+        taken_emails.add(email.lower())
+
+    errors = []
+    for line, data in staff:
+        detail = {}
+        if data["username"] in taken_usernames:
+            detail["username"] = "This username already exists."
+        if data["email"].lower() in taken_emails:
+            detail["email"] = "This email already exists."
+        if detail:
+            errors.append({"row": line, "errors": detail})
+    return errors
+
+
+def provision_staff(rows, *, organization):
+    """
+    Create a staff user and membership in ``organization`` for each of
+    ``rows`` (dicts of ``StaffCreateSerializer`` input). Returns the new
+    memberships, with ``user`` and ``organization`` set; raises
+    ``StaffBatchError`` and creates nothing if any row is rejected.
+    """
+    staff, errors = _validate(rows)
+    if staff:
+        errors += _taken(staff)
+    if errors:
+        raise StaffBatchError(sorted(errors, key=lambda error: error["row"]))
+
+    passwords = hash_passwords([data["password"] for _, data in staff])
+    users = [
+        User(
+            username=data["username"],
+            email=data["email"],
+            password=password,
+            company_name=organization.name,
+            current_org=organization,
+        )
+        for (_, data), password in zip(staff, passwords)
+    ]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            memberships = Membership.objects.bulk_create([
+                Membership(
+                    user=user,
+                    organization=organization,
+                    role=Membership.Role.STAFF,
+                    **{flag: data.get(flag, False) for flag in PERMISSION_FLAGS},
+                )
+                for user, (_, data) in zip(users, staff)
+            ])
+    except IntegrityError:
+        # lost a race with another request for the same username or email
+        errors = _taken(staff)
+        if not errors:
+            raise
+        raise StaffBatchError(errors)
+    return memberships
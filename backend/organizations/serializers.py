@@ -6,78 +6,7 @@ User = get_user_model()
 
 
 # ------------------------------
-# 1️⃣  USER SIGNUP SERIALIZER
-# ------------------------------
-class UserSignupSerializer(serializers.ModelSerializer):
-    """
-    Handles new user registration and automatic organization creation.
-    Supports multiple 'preference' selections (ArrayField).
-    """
-
-    # Allow multiple industries to be selected
-    preference = serializers.ListField(
-        child=serializers.ChoiceField(choices=Organization.PREFERENCES),
-        required=False
-    )
-
-    class Meta:
-        model = User
-        fields = [
-            "username",
-            "email",
-            "password",
-            "company_name",
-            "address",
-            "phone_number",
-            "preference",
-        ]
-        extra_kwargs = {"password": {"write_only": True}}
-
-    def validate_preference(self, value):
-        """Normalize preference: convert string to list if necessary."""
-        if isinstance(value, str):
-            return [value]
-        if not isinstance(value, list):
-            raise serializers.ValidationError("Preference must be a list or string.")
-        return value
-
-    def create(self, validated_data):
-        preferences = validated_data.pop("preference", [])
-        password = validated_data.pop("password")
-
-        # Create user (first signup becomes org owner)
-        user = User.objects.create_user(password=password, **validated_data)
-
-        # Create organization and link to user
-        org = Organization.objects.create(
-            name=user.company_name or f"{user.username}'s Organization",
-            owner=user,
-            preference=preferences or ["other"],
-        )
-
-        user.current_org = org
-        user.is_superuser = True  # First signup becomes superuser
-        user.is_staff = True
-        user.save()
-
-        # Also create a Membership record
-        Membership.objects.create(
-            user=user,
-            organization=org,
-            role=Membership.Role.OWNER,
-            can_manage_sales=True,
-            can_manage_inventory=True,
-            can_manage_services=True,
-            can_view_reports=True,
-            can_manage_users=True,
-            can_create_customers=True,
-        )
-
-        return user
-
-
-# ------------------------------
-# 2️⃣  STAFF CREATION SERIALIZER
+# STAFF CREATION SERIALIZER
 # ------------------------------
 class StaffCreateSerializer(serializers.ModelSerializer):
     """
@@ -0,0 +1,32 @@
+# organizations/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.cache import forget_user
+from users.models import User
+from users.tokens import revoke_tokens
+from .access import invalidate_organization, invalidate_user
+from .cache import forget_organization
+from .models import Membership, Organization
+
+
+@receiver([post_save, post_delete], sender=Membership)
+def membership_changed(sender, instance, **kwargs):
+    invalidate_user(instance.user_id, instance.organization_id)
+    forget_user(instance.user_id)
+    if not kwargs.get("created"):
+        # stateless tokens carry the old role and flags
+        revoke_tokens(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def organization_changed(sender, instance, **kwargs):
+    invalidate_organization(instance.pk)
+    forget_organization(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def member_changed(sender, instance, **kwargs):
+    # the profile names the owner
+    if instance.current_org_id is not None:
+        forget_organization(instance.current_org_id)
@@ -0,0 +1,55 @@
+# organizations/tenants.py
+"""
+Signup: a new owner account together with its organization.
+
+The password is hashed before the transaction opens, so the slow PBKDF2
+work holds no row locks and no open transaction. Inside it the tenant
+costs four writes: the user (already flagged as superuser and carrying
+the company name), the organization, the user's ``current_org`` and the
+owner membership. A failure at any step, including a username or email
+taken by a concurrent signup, rolls all of them back.
+"""
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from users.models import User
+from .models import Membership, Organization
+
+
+def create_tenant(*, username, email, password, company_name, preferences, **profile):
+    """
+    Create the owner ``User``, their ``Organization`` and the owner
+    ``Membership``; return the user. ``profile`` holds further ``User``
+    fields (``address``, ``phone_number``). Raises ``ValidationError`` if the
+    username or email was taken since validation.
+    """
+    user = User(
+        username=username,
+        email=User.objects.normalize_email(email),
+        password=make_password(password),
+        company_name=company_name,
+        is_superuser=True,
+        is_staff=True,
+        **profile,
+    )
+    try:
+        with transaction.atomic():
+            user.save(force_insert=True)
+            org = Organization.objects.create(name=company_name, preference=preferences, owner=user)
+            user.current_org = org
+            user.save(update_fields=["current_org"])
+            Membership.objects.create(
+                user=user,
+                organization=org,
+                role=Membership.Role.OWNER,
+                can_manage_users=True,
+                can_manage_inventory=True,
+                can_manage_sales=True,
+                can_manage_services=True,
+                can_view_reports=True,
+            )
+    except IntegrityError:
+        # lost a race with another signup for the same username or email
+        raise serializers.ValidationError({"detail": "A user with this username or email already exists."})
+    return user
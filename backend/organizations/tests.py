@@ -1,3 +1,272 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+
+from inventory.importers import read_rows
+from techapp.querybudget import QueryBudgetTestCase, seed_tenant
+from users.cache import get_cached_user, user_cache
+from users.models import User
+from . import provisioning
+from .models import Membership
+from .serializers import StaffCreateSerializer
+from .views import AsyncOrganizationProfileView
+
+
+class OrganizationsQueryBudgetTests(QueryBudgetTestCase):
+    endpoints = {"add-staff", "bulk-add-staff", "staff-list", "org-profile", "set-preferences"}
+
+    def test_staff_list(self):
+        for size, owner, org in self.tenants():
+            response = self.assertBudget(2, self.client_for(owner).get, reverse("staff-list"), status=200)
+            self.assertEqual(len(response.data), size + 1)
+            # the .values() path renders what StaffCreateSerializer does
+            memberships = Membership.objects.filter(organization=org).select_related("user", "organization")
+            self.assertEqual(response.data, StaffCreateSerializer(memberships, many=True).data)
+
+    def test_profile(self):
+        for size, owner, org in self.tenants():
+            client = self.client_for(owner)
+            response = self.assertBudget(2, client.get, reverse("org-profile"), status=200)
+            # user and profile come from the tiered cache once warm
+            self.assertBudget(0, client.get, reverse("org-profile"), status=200)
+            self.assertBudget(0, client.get, reverse("org-profile"), HTTP_IF_NONE_MATCH=response["ETag"], status=304)
+
+    def test_add_staff(self):
+        for size, owner, org in self.tenants():
+            self.assertBudget(
+                7, self.client_for(owner).post, reverse("add-staff"),
+                {"username": f"added{size}", "email": f"added{size}@example.com", "password": "staff-pass-123"},
+                format="json", status=201,
+            )
+
+    def test_bulk_add_staff(self):
+        for size, owner, org in self.tenants():
+            staff = [
+                {"username": f"bulk{size}-{n}", "email": f"bulk{size}-{n}@example.com", "password": "staff-pass-123"}
+                for n in range(size)
+            ]
+            response = self.assertBudget(
+                8, self.client_for(owner).post, reverse("bulk-add-staff"), staff, format="json", status=201,
+            )
+            self.assertEqual(response.data["created"], size)
+
+    def test_set_preferences(self):
+        for size, owner, org in self.tenants():
+            self.assertBudget(
+                3, self.client.post, reverse("set-preferences"),
+                {"user_email": owner.email, "preferences": ["pharmacy"]},
+                content_type="application/json", status=200,
+            )
+
+
+class AsyncOrganizationProfileViewTests(QueryBudgetTestCase):
+    def test_matches_sync_view(self):
+        for size, owner, org in self.tenants():
+            url = reverse("org-profile")
+            expected = self.client_for(owner).get(url).json()
+            # warmed by the sync request
+            response = self.assertBudget(0, self.async_view, AsyncOrganizationProfileView, "get", url, owner)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.content), expected)
+
+    def test_without_organization(self):
+        seed_tenant("profile")
+        user = User.objects.create(username="loner", email="loner@example.com")
+        response = self.async_view(AsyncOrganizationProfileView, "get", reverse("org-profile"), user)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), {"detail": "No organization found."})
+
+
+class OrganizationProfileConditionalGetTests(QueryBudgetTestCase):
+    def test_preferences_change_the_etag(self):
+        owner, org = seed_tenant("etag")
+        client = self.client_for(owner)
+        first = client.get(reverse("org-profile"))
+        self.assertEqual(client.get(reverse("org-profile"), HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        self.client.post(
+            reverse("set-preferences"), {"user_email": owner.email, "preferences": ["pharmacy"]},
+            content_type="application/json",
+        )
+        response = client.get(reverse("org-profile"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["preference"], ["pharmacy"])
+
+
+class BulkAddStaffTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("bulk", staff=1)
+        self.client = self.client_for(self.owner)
+        self.url = reverse("bulk-add-staff")
+
+    def test_creates_users_and_memberships(self):
+        response = self.client.post(self.url, {"staff": [
+            {"username": "ada", "email": "ada@Example.COM", "password": "staff-pass-123", "can_manage_sales": True},
+            {"username": "bob", "email": "bob@example.com", "password": "staff-pass-123"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual([s["user_name"] for s in response.data["staff"]], ["ada", "bob"])
+
+        ada = User.objects.get(username="ada")
+        self.assertEqual(ada.email, "ada@example.com")
+        self.assertEqual(ada.current_org, self.org)
+        self.assertTrue(ada.check_password("staff-pass-123"))
+        self.assertTrue(ada.membership.can_manage_sales)
+        self.assertEqual(ada.membership.role, Membership.Role.STAFF)
+        # the new staff can sign in right away
+        self.assertEqual(self.client_for(ada).get(reverse("current-user")).status_code, 200)
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile(
+            "staff.csv",
+            b"username,email,password,can_manage_inventory\ncsv1,csv1@example.com,staff-pass-123,true\n",
+            content_type="text/csv",
+        )
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertTrue(User.objects.get(username="csv1").membership.can_manage_inventory)
+
+    def test_rejects_the_whole_batch(self):
+        taken = User.objects.exclude(pk=self.owner.pk).filter(current_org=self.org).first()
+        response = self.client.post(self.url, [
+            {"username": "fine", "email": "fine@example.com", "password": "staff-pass-123"},
+            {"username": taken.username, "email": "other@example.com", "password": "staff-pass-123"},
+            {"username": "dup", "email": "FINE@example.com", "password": "staff-pass-123"},
+            {"username": "noemail", "password": "staff-pass-123"},
+        ], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["created"], 0)
+        errors = {error["row"]: error["errors"] for error in response.data["errors"]}
+        self.assertEqual(sorted(errors), [2, 3, 4])
+        self.assertIn("username", errors[2])
+        self.assertIn("email", errors[3])
+        self.assertIn("email", errors[4])
+        self.assertFalse(User.objects.filter(username="fine").exists())
+
+    def test_username_taken_during_the_batch(self):
+        User.objects.create(username="racer", email="racer@example.com")
+        # the pre-insert check misses the user a concurrent request just created
+        taken, checks = provisioning._taken, []
+
+        def check_then_lose_the_race(staff):
+            checks.append(staff)
+            return [] if len(checks) == 1 else taken(staff)
+
+        with mock.patch.object(provisioning, "_taken", check_then_lose_the_race):
+            response = self.client.post(self.url, [
+                {"username": "fine", "email": "fine@example.com", "password": "staff-pass-123"},
+                {"username": "racer", "email": "other@example.com", "password": "staff-pass-123"},
+            ], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["errors"], [{"row": 2, "errors": {"username": "This username already exists."}}])
+        self.assertFalse(User.objects.filter(username="fine").exists())
+
+    @override_settings(STAFF_PROVISIONING_MAX_ROWS=2)
+    def test_oversized_upload_is_not_read_to_the_end(self):
+        read = []
+
+        def counting_rows(upload):
+            for row in read_rows(upload):
+                read.append(row)
+                yield row
+
+        lines = "".join(f"u{i},u{i}@example.com,staff-pass-123\n" for i in range(10))
+        upload = SimpleUploadedFile("staff.csv", f"username,email,password\n{lines}".encode(), content_type="text/csv")
+        with mock.patch("organizations.views.read_rows", counting_rows):
+            response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["detail"], "At most 2 staff per request.")
+        self.assertEqual(len(read), 3)
+
+    def test_owners_only(self):
+        member = User.objects.exclude(pk=self.owner.pk).filter(current_org=self.org).first()
+        response = self.client_for(member).post(self.url, [], format="json")
+        self.assertEqual(response.status_code, 403)
+
+
+class CachedMetadataTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("cached")
+        self.client = self.client_for(self.owner)
+
+    def profile(self):
+        response = self.client.get(reverse("org-profile"))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_organization_save_refreshes_profile(self):
+        self.assertEqual(self.profile()["name"], self.org.name)
+        self.org.name = "Renamed"
+        self.org.save()
+        self.assertEqual(self.profile()["name"], "Renamed")
+
+    def test_owner_save_refreshes_profile(self):
+        self.profile()
+        self.owner.username = "new-owner-name"
+        self.owner.save()
+        self.assertEqual(self.profile()["owner"], "new-owner-name")
+        self.assertEqual(self.client.get(reverse("current-user")).data["username"], "new-owner-name")
+
+    def test_deactivated_user_is_refused_at_once(self):
+        self.profile()
+        self.owner.is_active = False
+        self.owner.save()
+        self.assertEqual(self.client.get(reverse("org-profile")).status_code, 401)
+
+    def test_password_hash_is_not_cached(self):
+        self.profile()
+        shared = user_cache.shared.get(user_cache._key(str(self.owner.pk)), version=user_cache.version)
+        self.assertNotIn("password", shared.__dict__)
+        # still loaded on demand
+        self.assertEqual(get_cached_user(self.owner.pk).password, self.owner.password)
+
+    def test_request_user_is_a_copy(self):
+        self.profile()
+        get_cached_user(self.owner.pk).username = "mutated"
+        self.assertEqual(get_cached_user(self.owner.pk).username, self.owner.username)
+
+
+class AccessInvalidationTests(QueryBudgetTestCase):
+    """Authorization is cached between requests; changes must show on the next one."""
+
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("access", staff=1)
+        self.membership = Membership.objects.get(organization=self.org, role=Membership.Role.STAFF)
+        self.staff = self.client_for(self.membership.user)
+
+    def test_flag_change(self):
+        self.assertEqual(self.staff.get(reverse("sales-list")).status_code, 200)
+        self.membership.can_manage_sales = False
+        self.membership.save()
+        self.assertEqual(self.staff.get(reverse("sales-list")).status_code, 403)
+        self.membership.can_manage_sales = True
+        self.membership.save()
+        self.assertEqual(self.staff.get(reverse("sales-list")).status_code, 200)
+
+    def test_staff_removal(self):
+        self.assertEqual(self.staff.get(reverse("sales-list")).status_code, 200)
+        self.membership.delete()
+        self.assertEqual(self.staff.get(reverse("sales-list")).status_code, 403)
+
+    def test_ownership_transfer(self):
+        owner = self.client_for(self.owner)
+        self.assertEqual(owner.post(reverse("add-staff"), {}, format="json").status_code, 400)
+        self.assertEqual(self.staff.post(reverse("add-staff"), {}, format="json").status_code, 403)
+
+        old = Membership.objects.get(user=self.owner)
+        old.role = Membership.Role.ADMIN
+        old.save()
+        self.membership.role = Membership.Role.OWNER
+        self.membership.save()
+        self.org.owner = self.membership.user
+        self.org.save()
+
+        self.assertEqual(owner.post(reverse("add-staff"), {}, format="json").status_code, 403)
+        self.assertEqual(self.staff.post(reverse("add-staff"), {}, format="json").status_code, 400)
+        self.assertEqual(owner.get(reverse("org-profile")).data["owner"], self.membership.user.username)
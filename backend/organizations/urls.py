@@ -1,10 +1,14 @@
+from django.conf import settings
 from django.urls import path
-from .views import AddStaffView,StaffListView,OrganizationProfileView, SetPreferencesView
+from .views import AddStaffView,BulkAddStaffView,StaffListView,OrganizationProfileView, AsyncOrganizationProfileView, SetPreferencesView
+
+ProfileView = AsyncOrganizationProfileView if settings.ASYNC_VIEWS else OrganizationProfileView
 
 urlpatterns = [
     path("add-staff/", AddStaffView.as_view(), name="add-staff"),
+    path("add-staff/bulk/", BulkAddStaffView.as_view(), name="bulk-add-staff"),
     path("staff/", StaffListView.as_view(), name="staff-list"),
-    path("profile/", OrganizationProfileView.as_view(), name="org-profile"),
+    path("profile/", ProfileView.as_view(), name="org-profile"),
     path("set-preferences/", SetPreferencesView.as_view(), name="set-preferences"),
 
 
@@ -1,10 +1,23 @@
+from itertools import islice
+
+from django.conf import settings
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from .serializers import StaffCreateSerializer
-from .models import Membership
+from .access import get_access
+from .cache import organization_profile
+from .provisioning import StaffBatchError, provision_staff
+from inventory.importers import ImportFileError, read_rows
+from .models import Membership, Organization
 from users.models import User
+from techapp.async_views import AsyncAPIView
+from techapp.conditional import ConditionalGetMixin
+from techapp.values import ValuesListMixin, ValuesSerializer
 
 
 class AddStaffView(generics.CreateAPIView):
@@ -13,43 +26,126 @@ class AddStaffView(generics.CreateAPIView):
     """
     serializer_class = StaffCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # StaffCreateSerializer needs the owner's User row
+    authentication_classes = [JWTAuthentication]
 
     def create(self, request, *args, **kwargs):
     # Only organization owners (role=OWNER) can add staff
-        if not Membership.objects.filter(user=request.user, role=Membership.Role.OWNER).exists():
+        if not get_access(request).is_owner:
          return Response(
             {"detail": "Only organization owners can add staff."},
             status=status.HTTP_403_FORBIDDEN
         )
         return super().create(request, *args, **kwargs)
 
-class StaffListView(generics.ListAPIView):
+class BulkAddStaffView(APIView):
+    """
+    Add many staff at once: a JSON list (or ``{"staff": [...]}``) of
+    AddStaffView bodies, or a CSV/XLSX upload (multipart field ``file``)
+    with those field names in the header row. All or nothing: any invalid
+    row, or a username/email already taken, rejects the batch with the
+    row numbers at fault.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser, MultiPartParser]
+
+    def post(self, request):
+        if not get_access(request).is_owner:
+            return Response(
+                {"detail": "Only organization owners can add staff."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        upload = request.FILES.get("file")
+        try:
+            if upload is not None:
+                # one row past the limit is enough to reject the upload
+                rows = list(islice(read_rows(upload), settings.STAFF_PROVISIONING_MAX_ROWS + 1))
+            else:
+                rows = request.data
+                if isinstance(rows, dict):
+                    rows = rows.get("staff")
+                if not isinstance(rows, list):
+                    return Response({"detail": "Send a list of staff or a CSV/XLSX file."}, status=400)
+        except ImportFileError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        if not rows:
+            return Response({"detail": "No staff given."}, status=400)
+        if len(rows) > settings.STAFF_PROVISIONING_MAX_ROWS:
+            return Response(
+                {"detail": f"At most {settings.STAFF_PROVISIONING_MAX_ROWS} staff per request."},
+                status=400,
+            )
+
+        organization = Organization.objects.only("name").get(pk=request.user.current_org_id)
+        try:
+            memberships = provision_staff(rows, organization=organization)
+        except StaffBatchError as exc:
+            return Response({"created": 0, "errors": exc.errors}, status=400)
+        return Response(
+            {"created": len(memberships), "staff": StaffCreateSerializer(memberships, many=True).data},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class StaffListView(ValuesListMixin, generics.ListAPIView):
     """
     List all staff members belonging to the signed-in superuser’s organization.
     """
     serializer_class = StaffCreateSerializer
+    # rows are read with .values(), joining user and organization
+    values_serializer = ValuesSerializer(StaffCreateSerializer)
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        org = getattr(user, "current_org", None)
-        if org:
-            return Membership.objects.filter(organization=org).select_related("user")
+        org_id = self.request.user.current_org_id
+        if org_id:
+            return Membership.objects.filter(organization_id=org_id)
         return Membership.objects.none()
     
-class OrganizationProfileView(APIView):
+class OrganizationProfileView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    def get_profile(self):
+        # read once for the validators and the body, from organizations.cache
+        if not hasattr(self, "_profile"):
+            self._profile = organization_profile(self.request.user.current_org_id)
+        return self._profile
+
+    def get_validators(self):
+        profile = self.get_profile()
+        if profile is None:
+            return None, None
+        updated_at = profile["updated_at"]
+        return (self.request.user.current_org_id, updated_at.isoformat()), updated_at
+
     def get(self, request):
-        org = getattr(request.user, "current_org", None)
-        if not org:
+        profile = self.get_profile()
+        if not profile:
             return Response({"detail": "No organization found."}, status=404)
-        return Response({
-            "name": org.name,
-            "preference": org.preference,
-            "owner": org.owner.username,
-            "created_at": org.created_at,
-        })
+        return Response(profile_data(profile))
+
+
+class AsyncOrganizationProfileView(AsyncAPIView):
+    """``OrganizationProfileView`` for ASGI deployments (see ``settings.ASYNC_VIEWS``)."""
+    sync_view = OrganizationProfileView
+
+    async def get(self, request):
+        # initial() already loaded the profile for the validators
+        profile = self.view.get_profile()
+        if not profile:
+            raise NotFound("No organization found.")
+        return profile_data(profile)
+
+
+def profile_data(profile):
+    return {
+        "name": profile["name"],
+        "preference": profile["preference"],
+        "owner": profile["owner__username"],
+        "created_at": profile["created_at"],
+    }
+
 class SetPreferencesView(APIView):
     permission_classes = [permissions.AllowAny]
 
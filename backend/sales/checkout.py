@@ -0,0 +1,74 @@
+# sales/checkout.py
+from django.db import transaction
+from rest_framework import serializers
+from inventory.models import StockMovement
+from inventory.stock import apply_movements, lock_products
+
+from .models import Sale, SaleLine
+
+
+def checkout(lines, *, organization_id, cashier, customer_name="", payment_method=Sale.PaymentMethod.CASH):
+    """
+    Record a sale and take its lines out of stock in one transaction.
+
+    Runs a fixed number of queries whatever the number of lines: one
+    ordered ``SELECT ... FOR UPDATE`` over the products (see
+    ``inventory.stock.lock_products``), the Sale INSERT, one bulk UPDATE of
+    quantities, and one bulk INSERT each for the stock ledger and the sale
+    lines. Unit prices are snapshotted from the locked rows. Lines for the
+    same product are merged into one, in the order first given.
+
+    Returns ``(sale, sale_lines)``; raises ``ValidationError`` and writes
+    nothing if a product is unknown or out of stock.
+    """
+    quantities = {}
+    for line in lines:
+        quantities[line["product"]] = quantities.get(line["product"], 0) + line["quantity"]
+
+    with transaction.atomic():
+        products = lock_products(organization_id, quantities)
+
+        sale_lines = []
+        for product_id, quantity in quantities.items():
+            product = products[product_id]
+            if quantity > product.quantity:
+                raise serializers.ValidationError(
+                    {"lines": f"Only {product.quantity} of {product.name} in stock."}
+                )
+            sale_lines.append(SaleLine(
+                product=product,
+                product_name=product.name,
+                quantity=quantity,
+                unit_price=product.unit_price,
+                line_total=product.unit_price * quantity,
+            ))
+
+        sale = Sale.objects.create(
+            organization_id=organization_id,
+            cashier_id=cashier.pk,
+            customer_name=customer_name,
+            payment_method=payment_method,
+            item_count=sum(line.quantity for line in sale_lines),
+            total=sum(line.line_total for line in sale_lines),
+        )
+
+        apply_movements(
+            [
+                {
+                    "product_id": line.product.pk,
+                    "kind": StockMovement.Kind.SALE,
+                    "change": -line.quantity,
+                    "note": f"Sale #{sale.pk}",
+                }
+                for line in sale_lines
+            ],
+            organization_id=organization_id,
+            user=cashier,
+            products=products,
+        )
+
+        for line in sale_lines:
+            line.sale = sale
+        SaleLine.objects.bulk_create(sale_lines)
+
+    return sale, sale_lines
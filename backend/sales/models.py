@@ -1,3 +1,71 @@
+from django.conf import settings
 from django.db import models
+from inventory.models import Product
+from organizations.models import Organization
 
-# Create your models here.
+
+class Sale(models.Model):
+    """
+    A completed point-of-sale checkout. Totals are fixed at checkout time.
+    """
+
+    class PaymentMethod(models.TextChoices):
+        CASH = "cash", "Cash"
+        CARD = "card", "Card"
+        TRANSFER = "transfer", "Bank Transfer"
+        OTHER = "other", "Other"
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="sales"
+    )
+    cashier = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="sales"
+    )
+    customer_name = models.CharField(max_length=200, blank=True)
+    payment_method = models.CharField(
+        max_length=20,
+        choices=PaymentMethod.choices,
+        default=PaymentMethod.CASH
+    )
+    item_count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["organization", "-created_at", "-id"], name="sales_sale_org_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Sale #{self.pk} – {self.total}"
+
+
+class SaleLine(models.Model):
+    """
+    One product on a sale, with name and unit price snapshotted so receipts
+    don't change when the catalogue does.
+    """
+
+    sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name="lines")
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="sale_lines"
+    )
+    product_name = models.CharField(max_length=200)
+    quantity = models.PositiveIntegerField()
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    line_total = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.quantity} × {self.product_name}"
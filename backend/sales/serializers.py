@@ -0,0 +1,35 @@
+from rest_framework import serializers
+from .models import Sale, SaleLine
+
+
+class CheckoutLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class CheckoutSerializer(serializers.Serializer):
+    lines = CheckoutLineSerializer(many=True, allow_empty=False)
+    customer_name = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    payment_method = serializers.ChoiceField(choices=Sale.PaymentMethod.choices, required=False)
+
+
+class SaleLineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SaleLine
+        fields = ["id", "product", "product_name", "quantity", "unit_price", "line_total"]
+
+
+class SaleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Sale
+        fields = [
+            "id", "cashier", "customer_name", "payment_method",
+            "item_count", "total", "organization", "created_at",
+        ]
+
+
+class SaleDetailSerializer(SaleSerializer):
+    lines = SaleLineSerializer(many=True, read_only=True)
+
+    class Meta(SaleSerializer.Meta):
+        fields = SaleSerializer.Meta.fields + ["lines"]
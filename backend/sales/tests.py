@@ -1,3 +1,111 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.db import transaction
+from django.urls import reverse
+
+from inventory.models import Product, StockMovement
+from organizations.models import Membership
+from techapp.querybudget import QueryBudgetTestCase, seed_tenant
+from .models import Sale, SaleLine
+
+
+class SalesQueryBudgetTests(QueryBudgetTestCase):
+    endpoints = {"sales-checkout", "sales-list", "sales-detail"}
+
+    def lines(self, org):
+        return [
+            {"product": pk, "quantity": 2}
+            for pk in Product.objects.filter(organization=org).values_list("pk", flat=True)
+        ]
+
+    def test_checkout(self):
+        for size, owner, org in self.tenants():
+            lines = self.lines(org)
+            response = self.assertBudget(
+                8, self.client_for(owner).post, reverse("sales-checkout"),
+                {"lines": lines}, format="json", status=201,
+            )
+            self.assertEqual(len(response.data["lines"]), size)
+
+    def test_sale_list_and_detail(self):
+        for size, owner, org in self.tenants():
+            client = self.client_for(owner)
+            lines = self.lines(org)
+            for _ in range(3):
+                sale_id = client.post(reverse("sales-checkout"), {"lines": lines}, format="json").data["id"]
+            # checkouts above cached the user row
+            self.assertBudget(1, client.get, reverse("sales-list"), status=200)
+            response = self.assertBudget(2, client.get, reverse("sales-detail", args=[sale_id]), status=200)
+            self.assertEqual(len(response.data["lines"]), size)
+
+
+class CheckoutTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("till", products=2, staff=1)
+        self.client = self.client_for(self.owner)
+        self.lamp, self.fan = Product.objects.filter(organization=self.org).order_by("id")
+        Product.objects.filter(pk=self.lamp.pk).update(quantity=3, unit_price=Decimal("2.50"))
+
+    def checkout(self, lines, client=None):
+        # apply_movements takes no savepoint of its own; give the request one
+        with transaction.atomic():
+            return (client or self.client).post(reverse("sales-checkout"), {"lines": lines}, format="json")
+
+    def test_receipt_and_stock(self):
+        response = self.checkout([{"product": self.lamp.pk, "quantity": 2}, {"product": self.fan.pk, "quantity": 1}])
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual((response.data["item_count"], response.data["total"]), (3, "14.99"))
+        self.assertEqual(Product.objects.get(pk=self.lamp.pk).quantity, 1)
+        sale = Sale.objects.get()
+        self.assertEqual(
+            list(StockMovement.objects.order_by("id").values_list("product_id", "change", "note")),
+            [(self.lamp.pk, -2, f"Sale #{sale.pk}"), (self.fan.pk, -1, f"Sale #{sale.pk}")],
+        )
+
+    def test_insufficient_stock_rolls_back_the_sale(self):
+        response = self.checkout([{"product": self.fan.pk, "quantity": 1}, {"product": self.lamp.pk, "quantity": 4}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Only 3 of", response.data["lines"])
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(SaleLine.objects.exists())
+        self.assertFalse(StockMovement.objects.exists())
+        self.assertEqual(Product.objects.get(pk=self.fan.pk).quantity, 1000)
+
+    def test_duplicate_lines_are_merged(self):
+        response = self.checkout([
+            {"product": self.lamp.pk, "quantity": 1}, {"product": self.fan.pk, "quantity": 1},
+            {"product": self.lamp.pk, "quantity": 2},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([(line["product"], line["quantity"]) for line in response.data["lines"]],
+                         [(self.lamp.pk, 3), (self.fan.pk, 1)])
+        self.assertEqual(Product.objects.get(pk=self.lamp.pk).quantity, 0)
+        # merged lines are checked against stock together
+        response = self.checkout([{"product": self.fan.pk, "quantity": 600}, {"product": self.fan.pk, "quantity": 600}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_line_snapshot_survives_product_edits(self):
+        sale_id = self.checkout([{"product": self.lamp.pk, "quantity": 1}]).data["id"]
+        self.client.patch(
+            reverse("inventory-product-detail", args=[self.lamp.pk]), {"name": "Renamed", "unit_price": "99.00"},
+            format="json",
+        )
+        self.assertEqual(Product.objects.get(pk=self.lamp.pk).unit_price, Decimal("99.00"))
+        [line] = self.client.get(reverse("sales-detail", args=[sale_id])).data["lines"]
+        self.assertEqual((line["product_name"], line["unit_price"], line["line_total"]), (self.lamp.name, "2.50", "2.50"))
+
+        self.client.delete(reverse("inventory-product-detail", args=[self.lamp.pk]))
+        [line] = self.client.get(reverse("sales-detail", args=[sale_id])).data["lines"]
+        self.assertEqual((line["product"], line["product_name"]), (None, self.lamp.name))
+
+    def test_needs_can_manage_sales(self):
+        membership = Membership.objects.get(organization=self.org, role=Membership.Role.STAFF)
+        staff = self.client_for(membership.user)
+        self.assertEqual(self.checkout([{"product": self.fan.pk, "quantity": 1}], staff).status_code, 201)
+
+        membership.can_manage_sales = False
+        membership.save()
+        self.assertEqual(self.checkout([{"product": self.fan.pk, "quantity": 1}], staff).status_code, 403)
+        self.assertEqual(staff.get(reverse("sales-list")).status_code, 403)
+        self.assertEqual(Sale.objects.count(), 1)
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CheckoutView, SaleListView, SaleDetailView
+
+urlpatterns = [
+    path("checkout/", CheckoutView.as_view(), name="sales-checkout"),
+    path("", SaleListView.as_view(), name="sales-list"),
+    path("<int:pk>/", SaleDetailView.as_view(), name="sales-detail"),
+]
@@ -1,3 +1,53 @@
-from django.shortcuts import render
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from inventory.pagination import ProductCursorPagination
+from organizations.permissions import CanManageSales
+from .checkout import checkout
+from .models import Sale
+from .serializers import CheckoutSerializer, SaleDetailSerializer, SaleLineSerializer, SaleSerializer
 
-# Create your views here.
+
+class SaleCursorPagination(ProductCursorPagination):
+    ordering = ("-created_at", "-id")
+
+
+class CheckoutView(APIView):
+    """
+    Complete a sale: ``{"lines": [{"product": id, "quantity": n}, ...],
+    "customer_name": "", "payment_method": "cash"}``. Returns the receipt.
+    """
+    permission_classes = [permissions.IsAuthenticated, CanManageSales]
+
+    def post(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        sale, lines = checkout(
+            data["lines"],
+            organization_id=request.user.current_org_id,
+            cashier=request.user,
+            customer_name=data.get("customer_name", ""),
+            payment_method=data.get("payment_method", Sale.PaymentMethod.CASH),
+        )
+        receipt = SaleSerializer(sale).data
+        receipt["lines"] = SaleLineSerializer(lines, many=True).data
+        return Response(receipt, status=status.HTTP_201_CREATED)
+
+
+class SaleListView(generics.ListAPIView):
+    serializer_class = SaleSerializer
+    permission_classes = [permissions.IsAuthenticated, CanManageSales]
+    pagination_class = SaleCursorPagination
+
+    def get_queryset(self):
+        return Sale.objects.filter(organization_id=self.request.user.current_org_id)
+
+
+class SaleDetailView(generics.RetrieveAPIView):
+    serializer_class = SaleDetailSerializer
+    permission_classes = [permissions.IsAuthenticated, CanManageSales]
+
+    def get_queryset(self):
+        return Sale.objects.filter(organization_id=self.request.user.current_org_id).prefetch_related("lines")
@@ -3,6 +3,18 @@ ASGI config for techapp project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serving through ASGI switches on ``ASYNC_VIEWS``, so the hot read endpoints
+run on the event loop and a slow client does not hold a thread. Run it with
+uvicorn workers under gunicorn::
+
+    gunicorn techapp.asgi:application -k uvicorn_worker.UvicornWorker -w 4
+
+or with uvicorn alone (``uvicorn techapp.asgi:application --workers 4``).
+Sync views still run on a thread per request while they execute. Those
+threads come and go, so persistent connections would pile up:
+``DB_CONN_MAX_AGE`` defaults to 0 here. Set ``DB_POOL=True`` to reuse
+connections through a pool instead.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +24,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techapp.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,127 @@
+# techapp/async_views.py
+"""
+Async counterparts of DRF views, for the hot read endpoints.
+
+DRF views are sync only. ``AsyncAPIView`` answers GET/HEAD with an
+``async def get`` that reads through the async ORM and returns data to
+render as JSON (or a finished response), and hands every other
+method to the sync DRF view it shadows (``sync_view``), so writes and
+OPTIONS behave exactly as before. Authentication, permission and throttle
+checks reuse the sync view's classes in one ``sync_to_async`` call, and
+errors are shaped by DRF's exception handler.
+
+Under ASGI (uvicorn) this lets one process hold many slow connections
+without a thread each; ``settings.ASYNC_VIEWS`` routes the URLs to these
+views and is switched on by ``techapp/asgi.py``.
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, HttpResponseBase
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from .conditional import ConditionalGetMixin, NotModified
+
+
+class AsyncAPIView(View):
+    sync_view = None
+    sync_handler = None
+    # the project's JSON renderer (orjson with FAST_JSON)
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Non-GET requests are served by the sync view, which does its own
+        # CSRF checks for session-authenticated requests.
+        return csrf_exempt(super().as_view(sync_handler=cls.sync_view.as_view(), **initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await sync_to_async(self.sync_handler)(request, *args, **kwargs)
+
+        self.view = self.sync_view(args=args, kwargs=kwargs, headers={})
+        self.request = self.view.request = Request(request, authenticators=self.view.get_authenticators())
+        try:
+            # authentication, permissions and throttles (and conditional GET
+            # validators), as APIView.initial runs them
+            await sync_to_async(self.view.initial)(self.request, *args, **kwargs)
+            data = await self.get(self.request, *args, **kwargs)
+            if isinstance(data, HttpResponseBase):
+                # e.g. a streaming response built by the handler itself
+                return data
+            status = 200
+        except NotModified as exc:
+            return self.view.set_validator_headers(exc.response)
+        except (exceptions.APIException, Http404, PermissionDenied) as exc:
+            data, status, headers = self.handle_exception(exc)
+            return self.render(request, data, status, headers)
+        response = self.render(request, data, status)
+        if isinstance(self.view, ConditionalGetMixin):
+            self.view.set_validator_headers(response)
+        return response
+
+    def handle_exception(self, exc):
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            auth_header = self.view.get_authenticate_header(self.request)
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = 403
+        response = exception_handler(exc, {"view": self.view, "request": self.request})
+        headers = {name: value for name, value in response.items() if name.lower() != "content-type"}
+        return response.data, response.status_code, headers
+
+    def render(self, request, data, status, headers=None):
+        # the body is encoded here rather than by a DRF Response, which
+        # would render on a worker thread
+        started = time.perf_counter()
+        content = self.renderer.render(data)
+        if hasattr(request, "_metrics_encode_seconds"):
+            request._metrics_encode_seconds += time.perf_counter() - started
+        return HttpResponse(content, status=status, headers=headers, content_type="application/json")
+
+    async def get(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+
+class AsyncListView(AsyncAPIView):
+    """
+    GET for a ``ListAPIView``: filters, pagination and serializer come from
+    ``sync_view``, as does the ``.values()`` path of ``ValuesListMixin``.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        view = self.view
+        if getattr(view, "values_serializer", None) is not None:
+            # ValuesListMixin: rows as dicts, no model instances
+            queryset = view.get_values_queryset()
+            represent = view.represent_values
+        else:
+            queryset = view.filter_queryset(view.get_queryset())
+
+            def represent(objs):
+                return view.get_serializer(objs, many=True).data
+        if view.paginator is None:
+            return represent([obj async for obj in queryset])
+        page = await view.paginator.apaginate_queryset(queryset, request, view=view)
+        return view.paginator.get_paginated_response(represent(page)).data
+
+
+class AsyncRetrieveView(AsyncAPIView):
+    """GET for a ``RetrieveAPIView``, looked up with the async ORM."""
+
+    async def get(self, request, *args, **kwargs):
+        view = self.view
+        queryset = view.filter_queryset(view.get_queryset())
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        instance = await queryset.filter(**{view.lookup_field: kwargs[lookup_url_kwarg]}).afirst()
+        if instance is None:
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        view.check_object_permissions(request, instance)
+        return view.get_serializer(instance).data
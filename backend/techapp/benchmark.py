@@ -0,0 +1,198 @@
+# techapp/benchmark.py
+"""
+In-process load generator for the ``benchmark`` management command.
+
+Requests go through Django's test client, so they run the real URLconf,
+middleware, authentication and database, without a web server in front.
+The test client does not close connections at the end of a request the
+way the request handler does, so the runner calls ``close_old_connections``
+around each request itself: ``CONN_MAX_AGE`` and the pool then behave as
+they would under a server, and connection setup is part of the latency.
+One thread is one busy worker; throughput at ``concurrency=1`` is what a
+single sync worker can serve, which is the number to size worker counts
+with.
+"""
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.urls import reverse
+
+
+class Session:
+    """A signed-in user of one tenant, with the product ids it can touch."""
+
+    def __init__(self, username, password, organization_id, is_owner, product_ids):
+        self.username = username
+        self.password = password
+        self.organization_id = organization_id
+        self.is_owner = is_owner
+        self.product_ids = product_ids
+        self.authorization = None
+
+
+def _token(client, session):
+    return client.post(
+        reverse("token_obtain_pair"),
+        {"username": session.username, "password": session.password},
+        content_type="application/json",
+    )
+
+
+def _product_create(client, session, rng):
+    return client.post(
+        reverse("inventory-products"),
+        {
+            "name": f"Benchmark item {rng.randint(1, 10**6)}",
+            "serial_number": f"run-{uuid.uuid4().hex}",
+            "category": "electronics",
+            "quantity": rng.randint(1, 100),
+            "unit_price": "19.99",
+        },
+        content_type="application/json",
+        HTTP_AUTHORIZATION=session.authorization,
+    )
+
+
+def _product_update(client, session, rng):
+    return client.patch(
+        reverse("inventory-product-detail", args=[rng.choice(session.product_ids)]),
+        # quantity changes go through the stock ledger
+        {"footnote": f"Benchmark note {rng.randint(1, 10**6)}"},
+        content_type="application/json",
+        HTTP_AUTHORIZATION=session.authorization,
+    )
+
+
+def _get(name):
+    def request(client, session, rng):
+        return client.get(reverse(name), HTTP_AUTHORIZATION=session.authorization)
+    return request
+
+
+# name: (weight, request, owners only)
+DEFAULT_MIX = {
+    "token": (1, lambda client, session, rng: _token(client, session), False),
+    "me": (3, _get("current-user"), False),
+    "profile": (2, _get("org-profile"), False),
+    "product-list": (6, _get("inventory-products"), False),
+    # only owners may set prices, which a new product needs
+    "product-create": (1, _product_create, True),
+    "product-update": (2, _product_update, False),
+}
+
+
+def parse_mix(spec):
+    """``"me=3,product-list=6"`` -> a mix with only those scenarios, reweighted."""
+    mix = {}
+    for part in filter(None, spec.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown scenario '{name}'. Choose from: {', '.join(DEFAULT_MIX)}.")
+        _, request, owners_only = DEFAULT_MIX[name]
+        mix[name] = (int(weight or 1), request, owners_only)
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def sign_in(sessions, host):
+    client = Client(SERVER_NAME=host)
+    for session in sessions:
+        response = _token(client, session)
+        if response.status_code != 200:
+            raise RuntimeError(f"Could not sign in as {session.username}: {response.status_code}")
+        session.authorization = f"Bearer {response.json()['access']}"
+
+
+def run(sessions, mix, *, requests, concurrency=1, warmup=0, seed=1, host="localhost"):
+    """
+    Replay ``requests`` weighted picks from ``mix`` (after ``warmup`` unrecorded
+    ones) spread over ``concurrency`` threads. Returns ``(samples, elapsed)``
+    where ``samples`` maps scenario name to ``[(seconds, status), ...]``.
+    """
+    owners = [session for session in sessions if session.is_owner]
+    names = list(mix)
+    weights = [mix[name][0] for name in names]
+    samples = defaultdict(list)
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(index, count, warm):
+        rng = random.Random(seed * 1000 + index)
+        client = Client(SERVER_NAME=host, raise_request_exception=False)
+        local = defaultdict(list)
+        measuring = False
+        try:
+            for i in range(warm + count):
+                if i == warm:
+                    # start the clock once every worker is warm
+                    barrier.wait()
+                    measuring = True
+                name = rng.choices(names, weights)[0]
+                _, request, owners_only = mix[name]
+                session = rng.choice(owners if owners_only else sessions)
+                started = time.perf_counter()
+                # what the handler does on request_started / request_finished
+                close_old_connections()
+                response = request(client, session, rng)
+                close_old_connections()
+                elapsed = time.perf_counter() - started
+                if measuring:
+                    local[name].append((elapsed, response.status_code))
+        finally:
+            if not measuring:
+                barrier.wait()
+            connection.close()
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    share, extra = divmod(requests, concurrency)
+    warm_share = warmup // concurrency
+    threads = [
+        threading.Thread(target=worker, args=(i, share + (i < extra), warm_share))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return dict(samples), time.perf_counter() - started
+
+
+def summarize(samples, elapsed):
+    """Per-scenario and overall request counts, errors, throughput and latency percentiles (ms)."""
+    rows = {}
+    everything = []
+    for name, values in sorted(samples.items()):
+        latencies = sorted(seconds for seconds, _ in values)
+        everything.extend(latencies)
+        rows[name] = _row(latencies, sum(1 for _, status in values if status >= 400), elapsed)
+    everything.sort()
+    errors = sum(row["errors"] for row in rows.values())
+    rows["all"] = _row(everything, errors, elapsed)
+    return rows
+
+
+def _row(latencies, errors, elapsed):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+    }
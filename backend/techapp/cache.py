@@ -0,0 +1,123 @@
+# techapp/cache.py
+"""
+Two-tier cache for small, hot tenant metadata (users, organization profiles).
+
+Reads try a bounded in-process LRU first, then the shared Django cache
+(``settings.CACHES``; Redis when ``REDIS_URL`` is set), then the loader.
+Entries live ``LOCAL_TIMEOUT`` seconds in the LRU and ``TIMEOUT`` seconds in
+the shared tier. Keys carry the cache's ``version``: bump it when the shape
+of a cached value changes, so no worker reads the old one.
+
+``delete`` clears both tiers of the calling process. Other workers keep
+serving their LRU copy for up to ``LOCAL_TIMEOUT`` seconds, so keep it
+short. A per-process shared cache (``LocMemCache``, the default without
+``REDIS_URL``) is private to each worker too and is never invalidated by
+the others, so its entries also live only ``LOCAL_TIMEOUT`` seconds; a
+change is then visible everywhere within ``LOCAL_TIMEOUT`` seconds either
+way. Setting ``TIERED_CACHE["SHARED"]`` to ``None`` leaves the LRU alone.
+
+Hits and misses are counted per cache and exported by ``/api/_metrics/``.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+_MISSING = object()
+
+# cache backends whose entries other processes cannot see
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+# every TieredCache by name, for the metrics endpoint
+tiered_caches = {}
+
+
+class TieredCache:
+    def __init__(self, name, *, version=1):
+        options = settings.TIERED_CACHE
+        self.name = name
+        self.version = version
+        self.max_entries = options["MAX_ENTRIES"]
+        self.local_timeout = options["LOCAL_TIMEOUT"]
+        self.timeout = options["TIMEOUT"]
+        self.shared_alias = options["SHARED"]
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+        tiered_caches[name] = self
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    @property
+    def shared_timeout(self):
+        if settings.CACHES[self.shared_alias]["BACKEND"] in PROCESS_LOCAL_CACHES:
+            return min(self.timeout, self.local_timeout)
+        return self.timeout
+
+    def _key(self, key):
+        return f"{self.name}:{key}"
+
+    def _count(self, result):
+        with self._lock:
+            self.stats[result] += 1
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+            self.stats["local_hits"] += 1
+            return value
+
+    def _set_local(self, key, value):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_timeout, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def get_or_set(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss. ``None`` is cached too."""
+        value = self._get_local(key)
+        if value is not _MISSING:
+            return value
+        shared = self.shared
+        if shared is not None:
+            value = shared.get(self._key(key), _MISSING, version=self.version)
+            if value is not _MISSING:
+                self._count("shared_hits")
+                self._set_local(key, value)
+                return value
+        self._count("misses")
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self._set_local(key, value)
+        if self.shared is not None:
+            self.shared.set(self._key(key), value, self.shared_timeout, version=self.version)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete_many([self._key(key) for key in keys], version=self.version)
+
+    def clear_local(self):
+        """Drop this process's LRU (tests, or after a bulk change made without signals)."""
+        with self._lock:
+            self._local.clear()
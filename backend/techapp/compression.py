@@ -0,0 +1,172 @@
+# techapp/compression.py
+"""
+Response compression tuned for API payloads.
+
+``CompressionMiddleware`` encodes responses with brotli when the client
+accepts ``br`` and the ``brotli`` package is installed, and with gzip
+otherwise. ``settings.COMPRESSION`` controls it:
+
+``MIN_SIZE``          bodies shorter than this many bytes go out as they are
+``CONTENT_TYPES``     media types worth compressing (JSON, CSV, NDJSON, ...)
+``GZIP_LEVEL``        zlib level, 1-9
+``BROTLI_QUALITY``    brotli quality, 0-11; 4-5 suits bodies built per request
+``EXEMPT_URL_NAMES``  views whose responses are never compressed
+
+Streaming responses (the product export) are compressed as they are
+produced, with one compressor for the whole stream. Event streams are not
+in ``CONTENT_TYPES``: a compressor holds data back, which would delay
+events.
+
+Compressing a secret next to text an attacker can choose lets the attacker
+guess the secret from the compressed sizes (BREACH). So responses that set
+cookies and the views in ``EXEMPT_URL_NAMES`` (the token endpoints) are
+never compressed, and compressed bodies get random-length padding: gzip
+through Django's ``compress_string``, brotli through a metadata block of
+random bytes, which decoders skip. Streams (the export) hold no secrets
+and are not padded.
+Compressed responses vary on ``Accept-Encoding``; responses to requests
+with an ``Authorization`` header are also marked ``private`` so shared
+caches never store a user's body.
+"""
+import secrets
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def accepted_encodings(header):
+    """The codings of an ``Accept-Encoding`` header, leaving out those with ``q=0``."""
+    encodings = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+def _brotli_padding(max_random_bytes):
+    """A brotli metadata meta-block (RFC 7932, 9.2) of 1 to ``max_random_bytes`` random bytes."""
+    length = 1 + secrets.randbelow(max_random_bytes)
+    skip = length - 1
+    # ISLAST=0, MNIBBLES=0 (metadata), reserved bit, MSKIPBYTES=1, then MSKIPLEN-1
+    header = bytes([0b010110 | (skip & 0b11) << 6, skip >> 2])
+    return header + secrets.token_bytes(length)
+
+
+def brotli_compress(data, quality, max_random_bytes):
+    """``brotli.compress`` with random-length padding against BREACH."""
+    compressor = brotli.Compressor(quality=quality)
+    # the flush ends the data on a byte boundary, where a meta-block can start
+    return compressor.process(data) + compressor.flush() + _brotli_padding(max_random_bytes) + compressor.finish()
+
+
+class _GzipStream:
+    def __init__(self, options):
+        # wbits=31: gzip container
+        self._compressor = zlib.compressobj(options["GZIP_LEVEL"], zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, options):
+        self._compressor = brotli.Compressor(quality=options["BROTLI_QUALITY"])
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def _compress_stream(chunks, stream):
+    for chunk in chunks:
+        data = stream.compress(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+async def _acompress_stream(chunks, stream):
+    async for chunk in chunks:
+        data = stream.compress(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Place near the top of ``MIDDLEWARE``, below ``RequestMetricsMiddleware``."""
+
+    # the padding GZipMiddleware adds against BREACH; at most 256 for brotli
+    max_random_bytes = 100
+
+    def process_response(self, request, response):
+        options = settings.COMPRESSION
+        if not self.should_compress(request, response, options):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if "HTTP_AUTHORIZATION" in request.META:
+            patch_cache_control(response, private=True)
+
+        encodings = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if "br" in encodings and brotli is not None:
+            encoding, stream_class = "br", _BrotliStream
+        elif "gzip" in encodings:
+            encoding, stream_class = "gzip", _GzipStream
+        else:
+            return response
+
+        if response.streaming:
+            compress = _acompress_stream if response.is_async else _compress_stream
+            response.streaming_content = compress(response.streaming_content, stream_class(options))
+            # the compressed size is only known at the end
+            del response.headers["Content-Length"]
+        else:
+            if encoding == "br":
+                compressed = brotli_compress(response.content, options["BROTLI_QUALITY"], self.max_random_bytes)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # a strong ETag names the uncompressed bytes (RFC 9110, 8.8.1)
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def should_compress(self, request, response, options):
+        if response.has_header("Content-Encoding") or response.cookies:
+            return False
+        if not response.streaming and len(response.content) < options["MIN_SIZE"]:
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in options["CONTENT_TYPES"]:
+            return False
+        match = getattr(request, "resolver_match", None)
+        return match is None or match.url_name not in options["EXEMPT_URL_NAMES"]
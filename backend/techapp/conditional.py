@@ -0,0 +1,81 @@
+# techapp/conditional.py
+"""
+Conditional GET for DRF views.
+
+A view using ``ConditionalGetMixin`` implements ``get_validators()``, which
+returns an ``(etag, last_modified)`` pair worked out with one cheap query
+(an aggregate or a single column). If the client's ``If-None-Match`` or
+``If-Modified-Since`` still matches, the view answers 304 before the
+queryset is loaded or serialized. Otherwise the full response carries
+``ETag`` / ``Last-Modified`` plus ``Cache-Control: private, no-cache``, so
+browsers keep the body and revalidate it on every poll.
+"""
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Opaque ETag value built from the given parts."""
+    return hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+class NotModified(Exception):
+    """Raised from ``initial()`` to answer the request with ``response`` (a 304)."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Checks the validators right after authentication and permissions, so it
+    works for any GET handler. Use before the DRF view class.
+    """
+
+    # bump when a view's representation changes, so clients drop old bodies
+    representation_version = 1
+
+    def get_validators(self):
+        """Return ``(etag, last_modified)``; either may be ``None``."""
+        raise NotImplementedError
+
+    def check_not_modified(self, request):
+        """Work out the validators; return a 304 response if the client's copy is current."""
+        etag, last_modified = self.get_validators()
+        if etag is not None:
+            etag = quote_etag(make_etag(self.representation_version, etag))
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        self._validators = etag, last_modified
+        return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    def set_validator_headers(self, response):
+        etag, last_modified = getattr(self, "_validators", (None, None))
+        if response.status_code in (200, 304):
+            if etag is not None:
+                response.headers.setdefault("ETag", etag)
+            if last_modified is not None:
+                response.headers.setdefault("Last-Modified", http_date(last_modified))
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in ("GET", "HEAD"):
+            response = self.check_not_modified(request)
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ("GET", "HEAD"):
+            self.set_validator_headers(response)
+        return response
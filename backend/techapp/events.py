@@ -0,0 +1,170 @@
+# techapp/events.py
+"""
+In-process channel layer for pushing events to connected clients.
+
+Code publishes a JSON-serialisable message to a group (e.g. ``org.42``)
+with ``publish_on_commit``; async views ``subscribe`` to a group and await
+its messages. The backend is chosen with ``settings.EVENT_BACKEND``:
+
+``LocalEventBackend``
+    Fan-out inside one process. The stand-in for development, tests and
+    single-worker deployments; workers do not see each other's events.
+``PostgresEventBackend``
+    Also relays every message through ``NOTIFY`` on the default database,
+    so each worker process delivers it to its own subscribers.
+
+A subscriber that falls ``max_queue`` messages behind gets a single
+``{"type": "resync"}`` message instead of the backlog.
+"""
+import asyncio
+import json
+import select
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """One subscriber's queue. Created by ``subscribe()``; read with ``await get()``."""
+
+    def __init__(self, backend, group, max_queue):
+        self.backend = backend
+        self.group = group
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def put(self, message):
+        """Thread-safe: hand ``message`` to the subscriber's event loop."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # the loop is gone; the subscriber will not read again
+            self.close()
+
+    def _put(self, message):
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = RESYNC
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class LocalEventBackend:
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._groups = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, group):
+        """Call from the event loop that will read the subscription."""
+        subscription = Subscription(self, group, self.max_queue)
+        with self._lock:
+            self._groups[group].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._groups.get(subscription.group)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._groups[subscription.group]
+
+    def publish(self, group, message):
+        self.deliver(group, message)
+
+    def deliver(self, group, message):
+        """Hand ``message`` to this process's subscribers of ``group``."""
+        with self._lock:
+            subscribers = list(self._groups.get(group, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+
+class PostgresEventBackend(LocalEventBackend):
+    """
+    Publishes with ``pg_notify``; a daemon thread per process LISTENs on its
+    own connection and delivers to local subscribers. Payloads must stay
+    under PostgreSQL's 8000-byte NOTIFY limit.
+    """
+
+    channel = "techapp_events"
+
+    def __init__(self, max_queue=100, database="default"):
+        super().__init__(max_queue)
+        self.database = database
+        self._listener = None
+
+    def subscribe(self, group):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="event-listener", daemon=True)
+                self._listener.start()
+        return super().subscribe(group)
+
+    def publish(self, group, message):
+        payload = json.dumps({"group": group, "message": message}, separators=(",", ":"))
+        with connections[self.database].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def _listen(self):
+        while True:
+            connection = connections.create_connection(self.database)
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                for payload in self._notifications(connection.connection):
+                    data = json.loads(payload)
+                    self.deliver(data["group"], data["message"])
+            except Exception:
+                # the database went away; reconnect
+                time.sleep(1)
+            finally:
+                connection.close()
+
+    def _notifications(self, raw):
+        if hasattr(raw, "notifies") and callable(raw.notifies):
+            # psycopg 3
+            while True:
+                for notify in raw.notifies(timeout=30):
+                    yield notify.payload
+        else:
+            # psycopg2
+            while True:
+                if select.select([raw], [], [], 30) != ([], [], []):
+                    raw.poll()
+                    while raw.notifies:
+                        yield raw.notifies.pop(0).payload
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(settings.EVENT_BACKEND)()
+    return _backend
+
+
+def publish_on_commit(group, message):
+    """
+    Publish once the current transaction commits (right away outside one).
+    A failing backend is logged, not raised: the write has already committed.
+    """
+    transaction.on_commit(lambda: get_backend().publish(group, message), robust=True)
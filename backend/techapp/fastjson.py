@@ -0,0 +1,76 @@
+# techapp/fastjson.py
+"""
+orjson-backed JSON renderer and parser for DRF.
+
+Drop-in replacements for ``JSONRenderer`` / ``JSONParser`` with the same
+output: compact UTF-8, UTC datetimes ending in ``Z``, and the other types
+DRF's encoder knows (``Decimal``, lazy strings, ...) converted as it does.
+Strings, numbers, dates, datetimes, dicts and lists are encoded inside
+orjson, without a Python call per value.
+
+One difference: DRF's renderer is strict and raises ``ValueError`` for
+NaN and infinities. A non-finite ``Decimal`` raises here too, but orjson
+writes a non-finite ``float`` as ``null``; checking every float would cost
+the Python call per value this module avoids. No serializer in this
+project returns floats.
+
+Enabled for every view by ``FAST_JSON`` (see ``settings.py``); a single
+view can opt in with ``renderer_classes = [ORJSONRenderer]``.
+"""
+import datetime
+import decimal
+import uuid
+
+import orjson
+from django.utils.functional import Promise
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+# non-string keys become strings, as json.dumps does
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    # the types rest_framework.utils.encoders.JSONEncoder handles, encoded the same way
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        if not obj.is_finite():
+            raise ValueError("Out of range float values are not JSON compliant")
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data, indent=False):
+    option = OPTIONS | orjson.OPT_INDENT_2 if indent else OPTIONS
+    return orjson.dumps(data, default=_default, option=option)
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        return dumps(data, indent=bool(indent))
+
+
+class ORJSONParser(BaseParser):
+    media_type = "application/json"
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read() if stream is not None else b"")
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
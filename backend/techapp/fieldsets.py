@@ -0,0 +1,103 @@
+# techapp/fieldsets.py
+"""
+Sparse fieldsets: ``?fields=id,name,quantity`` returns only those fields,
+``?omit=supplier_address,footnote`` everything but those. Both may be given.
+
+The chosen fields also decide which columns are read: model instances are
+loaded with ``.only()``, and ``ValuesListMixin`` views select just those
+columns with ``.values()``. Unused columns are neither fetched from the
+database nor encoded. Reads only; writes always use the full serializer.
+"""
+from rest_framework import serializers
+
+
+class DynamicFieldsMixin:
+    """Serializer mixin: ``ProductSerializer(products, many=True, fields=["id", "name"])``."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+def readable_fields(serializer_class):
+    return [name for name, field in serializer_class().fields.items() if not field.write_only]
+
+
+def parse_fieldset(params, available):
+    """
+    The fields named by ``?fields=`` / ``?omit=`` in ``available``'s order,
+    or ``None`` when neither is given. Unknown names are a 400.
+    """
+    requested, omitted = params.get("fields"), params.get("omit")
+    if not requested and not omitted:
+        return None
+    fieldset = list(available)
+    for param, value in (("fields", requested), ("omit", omitted)):
+        if not value:
+            continue
+        names = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = sorted(names - set(available))
+        if unknown:
+            raise serializers.ValidationError({param: f"Unknown fields: {', '.join(unknown)}."})
+        if param == "fields":
+            fieldset = [name for name in fieldset if name in names]
+        else:
+            fieldset = [name for name in fieldset if name not in names]
+    if not fieldset:
+        raise serializers.ValidationError({"fields": "Select at least one field."})
+    return fieldset
+
+
+def model_columns(serializer_class, names):
+    """The model fields the serializer's ``names`` read, for ``.only()``; annotations are left out."""
+    model = serializer_class.Meta.model
+    concrete = {field.name for field in model._meta.concrete_fields}
+    fields = serializer_class().fields
+    return [fields[name].source_attrs[0] for name in names if fields[name].source_attrs[0] in concrete]
+
+
+class SparseFieldsetMixin:
+    """
+    View mixin for ``?fields=`` / ``?omit=`` on GET; ``serializer_class``
+    must use ``DynamicFieldsMixin``. Use before the DRF view class (and
+    before ``ValuesListMixin``).
+    """
+    # columns .only() always loads, for views that read them themselves
+    required_columns = ()
+    # fields every fieldset includes, whatever ?fields= / ?omit= say
+    required_fields = ()
+
+    def get_fieldset(self):
+        if not hasattr(self, "_fieldset"):
+            self._fieldset = None
+            if self.request.method in ("GET", "HEAD"):
+                available = readable_fields(self.get_serializer_class())
+                fieldset = parse_fieldset(self.request.query_params, available)
+                if fieldset is not None and self.required_fields:
+                    fieldset = [name for name in available if name in fieldset or name in self.required_fields]
+                self._fieldset = fieldset
+        return self._fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            kwargs.setdefault("fields", fieldset)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_values_serializer(self):
+        values_serializer = super().get_values_serializer()
+        fieldset = self.get_fieldset()
+        return values_serializer if fieldset is None else values_serializer.subset(fieldset)
+
+    def prune_queryset(self, queryset):
+        """``queryset.only()`` the columns of the requested fields."""
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return queryset
+        columns = model_columns(self.get_serializer_class(), fieldset)
+        return queryset.only(*dict.fromkeys([*columns, *self.required_columns]))
+
+    def filter_queryset(self, queryset):
+        return self.prune_queryset(super().filter_queryset(queryset))
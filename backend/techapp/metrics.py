@@ -0,0 +1,304 @@
+# techapp/metrics.py
+"""
+Per-endpoint request metrics.
+
+``RequestMetricsMiddleware`` records, for every request, the number of SQL
+queries, time spent in the database, time spent serializing (building
+``serializer.data`` or ``ValuesSerializer.represent``), time the renderer
+spent encoding the response body and total time, keyed by the resolved URL
+name. Queries issued while serializing (an N+1) count towards both db and
+serialize time. Each response gets a ``Server-Timing`` header; the
+aggregates are served in Prometheus text format by ``metrics_view`` at
+``/api/_metrics/``.
+
+Aggregates live in process memory, so each worker reports its own numbers
+(scrape every worker, or sum them). Bodies of streaming responses are
+produced after the middleware returns and are not counted.
+
+Queries and serialization are attributed to the request through a context
+variable, which ``sync_to_async`` carries into the threads that async views
+run their ORM calls on. Serialization is timed by wrapping the ``data``
+property of DRF's ``Serializer`` and ``ListSerializer`` when this module is
+imported.
+"""
+import hmac
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from rest_framework import serializers
+
+from .cache import tiered_caches
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _RequestRecorder:
+    """Counts and times the queries of one request, and times its serialization."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.serialize_seconds = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+_recorder = ContextVar("request_metrics_recorder", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def _install(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _install(connection)
+
+
+connection_created.connect(_on_connection_created)
+
+
+@contextmanager
+def serializing():
+    """
+    Count the time inside towards the request's serialize time. Nested uses
+    (a serializer reading another's ``data``) are counted once. Also a
+    decorator.
+    """
+    recorder = _recorder.get()
+    if recorder is None or recorder.serializing:
+        yield
+        return
+    recorder.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.serialize_seconds += time.perf_counter() - start
+        recorder.serializing = False
+
+
+def _timed_data(prop):
+    def data(self):
+        with serializing():
+            return prop.fget(self)
+    data._metrics_timed = True
+    return property(data)
+
+
+for _serializer_class in (serializers.Serializer, serializers.ListSerializer):
+    if not getattr(_serializer_class.data.fget, "_metrics_timed", False):
+        _serializer_class.data = _timed_data(_serializer_class.data)
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.encode_seconds = 0.0
+        self.total_seconds = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(_EndpointStats)
+
+    def record(self, endpoint, method, status, queries, db_seconds, serialize_seconds, encode_seconds, total_seconds):
+        with self._lock:
+            stats = self._stats[(endpoint, method, status)]
+            stats.requests += 1
+            stats.queries += queries
+            stats.max_queries = max(stats.max_queries, queries)
+            stats.db_seconds += db_seconds
+            stats.serialize_seconds += serialize_seconds
+            stats.encode_seconds += encode_seconds
+            stats.total_seconds += total_seconds
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if total_seconds <= bound:
+                    stats.buckets[i] += 1
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {key: vars(stats).copy() for key, stats in self._stats.items()}
+
+    def render_prometheus(self):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        snapshot = sorted(self.snapshot().items())
+
+        def labels(key, extra=""):
+            endpoint, method, status = key
+            return f'endpoint="{endpoint}",method="{method}",status="{status}"{extra}'
+
+        family("http_requests_total", "counter", "Requests served.")
+        for key, s in snapshot:
+            lines.append(f"http_requests_total{{{labels(key)}}} {s['requests']}")
+
+        family("http_request_duration_seconds", "histogram", "Total time per request.")
+        for key, s in snapshot:
+            buckets = list(zip(DURATION_BUCKETS, s["buckets"])) + [("+Inf", s["requests"])]
+            for bound, count in buckets:
+                le = ',le="%s"' % bound
+                lines.append(f"http_request_duration_seconds_bucket{{{labels(key, le)}}} {count}")
+            lines.append(f"http_request_duration_seconds_sum{{{labels(key)}}} {s['total_seconds']:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels(key)}}} {s['requests']}")
+
+        family("db_queries_total", "counter", "SQL queries issued while serving requests.")
+        for key, s in snapshot:
+            lines.append(f"db_queries_total{{{labels(key)}}} {s['queries']}")
+
+        family("db_queries_per_request_max", "gauge", "Most SQL queries issued by a single request.")
+        for key, s in snapshot:
+            lines.append(f"db_queries_per_request_max{{{labels(key)}}} {s['max_queries']}")
+
+        family("db_duration_seconds_total", "counter", "Time spent in SQL queries.")
+        for key, s in snapshot:
+            lines.append(f"db_duration_seconds_total{{{labels(key)}}} {s['db_seconds']:.6f}")
+
+        family("serialize_duration_seconds_total", "counter", "Time spent building serializer output.")
+        for key, s in snapshot:
+            lines.append(f"serialize_duration_seconds_total{{{labels(key)}}} {s['serialize_seconds']:.6f}")
+
+        family("encode_duration_seconds_total", "counter", "Time renderers spent encoding response bodies.")
+        for key, s in snapshot:
+            lines.append(f"encode_duration_seconds_total{{{labels(key)}}} {s['encode_seconds']:.6f}")
+
+        family("cache_requests_total", "counter", "Tiered cache lookups by tier that answered.")
+        for name, tiered in sorted(tiered_caches.items()):
+            for result, count in sorted(tiered.stats.items()):
+                lines.append(f'cache_requests_total{{cache="{name}",result="{result}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetricsMiddleware:
+    """
+    Keep this first in ``MIDDLEWARE`` so the total covers the whole stack.
+    Disabled with ``REQUEST_METRICS_ENABLED = False``. Works under WSGI and
+    ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        recorder, token, start = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self._finish(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return await self.get_response(request)
+
+        recorder, token, start = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self._finish(request, response, recorder, start)
+
+    def _start(self, request):
+        recorder = _RequestRecorder()
+        request._metrics_encode_seconds = 0.0
+        return recorder, _recorder.set(recorder), time.perf_counter()
+
+    def _finish(self, request, response, recorder, start):
+        total = time.perf_counter() - start
+        match = getattr(request, "resolver_match", None)
+        endpoint = (match.view_name if match else None) or "unresolved"
+        encode = request._metrics_encode_seconds
+        registry.record(
+            endpoint, request.method, response.status_code,
+            recorder.count, recorder.duration, recorder.serialize_seconds, encode, total,
+        )
+
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+                f"serialize;dur={recorder.serialize_seconds * 1000:.1f}",
+                f"encode;dur={encode * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ])
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        if settings.REQUEST_METRICS_ENABLED:
+            started = time.perf_counter()
+
+            def rendered(response):
+                request._metrics_encode_seconds += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics_view(request):
+    """
+    Prometheus exposition of the aggregates. Requires
+    ``Authorization: Bearer <METRICS_TOKEN>``; without ``METRICS_TOKEN`` set
+    the endpoint does not exist.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()):
+        return HttpResponse("Unauthorized\n", status=401, content_type="text/plain")
+    return HttpResponse(
+        registry.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,129 @@
+# techapp/querybudget.py
+"""
+Helpers for the query-budget tests in each app's ``tests.py``.
+
+Every endpoint gets a fixed SQL query budget that must hold for a small and
+a large tenant alike, so an N+1 in a view or serializer fails the build.
+``techapp/tests.py`` checks that every named URL is covered by some
+``QueryBudgetTestCase.endpoints``.
+"""
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from inventory.models import Product
+from organizations.models import Membership, Organization
+from techapp.cache import tiered_caches
+from users.models import User
+from users.tokens import OrgTokenObtainPairSerializer
+
+# (small, large) tenant sizes every budget is checked against
+SIZES = (2, 40)
+PASSWORD = "budget-pass-123"
+
+
+def seed_tenant(name, products=0, staff=0):
+    """
+    Create an organization with its owner, ``staff`` members and
+    ``products`` products, using bulk inserts. Returns ``(owner, org)``.
+    """
+    password = make_password(PASSWORD)
+    owner = User.objects.create(
+        username=f"{name}-owner", email=f"{name}-owner@example.com",
+        password=password, is_superuser=True, is_staff=True,
+    )
+    org = Organization.objects.create(name=name, owner=owner, preference=["commerce"])
+    owner.current_org = org
+    owner.company_name = name
+    owner.save(update_fields=["current_org", "company_name"])
+    Membership.objects.create(
+        user=owner, organization=org, role=Membership.Role.OWNER,
+        can_manage_users=True, can_manage_inventory=True, can_manage_sales=True,
+        can_manage_services=True, can_view_reports=True, can_create_customers=True,
+    )
+
+    members = User.objects.bulk_create([
+        User(
+            username=f"{name}-staff{i}", email=f"{name}-staff{i}@example.com",
+            password=password, company_name=name, current_org=org,
+        )
+        for i in range(staff)
+    ])
+    Membership.objects.bulk_create([
+        Membership(user=member, organization=org, can_manage_inventory=True, can_manage_sales=True)
+        for member in members
+    ])
+
+    Product.objects.bulk_create([
+        Product(
+            organization=org, created_by=owner, name=f"{name} product {i}",
+            serial_number=f"{name}-SN{i}", category="electronics",
+            quantity=1000, unit_price=Decimal("9.99"),
+        )
+        for i in range(products)
+    ])
+    return owner, org
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    REQUEST_METRICS_SERVER_TIMING=False,
+)
+class QueryBudgetTestCase(TestCase):
+    """
+    Base class for query-budget tests. ``endpoints`` lists the URL names a
+    subclass covers.
+    """
+    endpoints = set()
+
+    def setUp(self):
+        # start every test with cold authorization and metadata caches
+        cache.clear()
+        for tiered in tiered_caches.values():
+            tiered.clear_local()
+        self._tokens = {}
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.authorization(user))
+        return client
+
+    def authorization(self, user):
+        # issuing a token reads the membership; do it once per user
+        if user.pk not in self._tokens:
+            self._tokens[user.pk] = f"Bearer {OrgTokenObtainPairSerializer.get_token(user).access_token}"
+        return self._tokens[user.pk]
+
+    def async_view(self, view_class, method, path, user=None, data=None, **kwargs):
+        """
+        Call an async view directly, whatever ``ASYNC_VIEWS`` is, and return
+        its response. ``kwargs`` are the URL kwargs.
+        """
+        headers = {"authorization": self.authorization(user)} if user else {}
+        factory = getattr(AsyncRequestFactory(), method)
+        if data is None:
+            request = factory(path, headers=headers)
+        else:
+            request = factory(path, data, content_type="application/json", headers=headers)
+        return async_to_sync(view_class.as_view())(request, **kwargs)
+
+    def tenants(self):
+        """Yield ``(size, owner, org)`` for a small and a large tenant."""
+        for size in SIZES:
+            owner, org = seed_tenant(f"t{size}", products=size, staff=size)
+            yield size, owner, org
+
+    def assertBudget(self, budget, request, *args, status=None, **kwargs):
+        """Run ``request(*args, **kwargs)`` within ``budget`` queries and return the response."""
+        with self.assertNumQueries(budget):
+            response = request(*args, **kwargs)
+            if getattr(response, "streaming", False):
+                # streamed bodies run their queries while being consumed
+                response.streamed_content = b"".join(response.streaming_content)
+        if status is not None:
+            self.assertEqual(response.status_code, status, getattr(response, "data", None))
+        return response
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 import dj_database_url
 from decouple import config
@@ -14,9 +15,36 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-g8#otg4pev)-ib01t8tso%u@y()j8^8n7-n&-_2&5v&c9(=^%_'
 
+# Connections. Either keep each worker's connection open between requests
+# (DB_CONN_MAX_AGE seconds, checked before reuse), or set DB_POOL to share a
+# psycopg pool per process (needs psycopg 3 and psycopg-pool; Django then
+# requires CONN_MAX_AGE 0). Pooling suits ASGI, where requests run on
+# short-lived threads. Benchmark with `manage.py benchmark_connections`.
+DB_POOL = config("DB_POOL", default=False, cast=bool)
 DATABASES = {
-    "default": dj_database_url.parse(config("DATABASE_URL"))
+    "default": dj_database_url.parse(
+        config("DATABASE_URL"),
+        conn_max_age=0 if DB_POOL else config("DB_CONN_MAX_AGE", default=60, cast=int),
+        conn_health_checks=True,
+    )
 }
+if DB_POOL:
+    # conn_health_checks above makes the pool check each connection it hands out
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+        "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+        # seconds a request waits for a free connection before failing
+        "timeout": config("DB_POOL_TIMEOUT", default=10, cast=float),
+        # idle connections above min_size are closed after this many seconds
+        "max_idle": config("DB_POOL_MAX_IDLE", default=300, cast=float),
+        # recycle connections before a hosted database or proxy drops them
+        "max_lifetime": config("DB_POOL_MAX_LIFETIME", default=1800, cast=float),
+    }
+# Server-side cursors (used by streaming exports) don't survive a
+# transaction-mode pooler such as PgBouncer; turn them off behind one.
+DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = config(
+    "DB_DISABLE_SERVER_SIDE_CURSORS", default=False, cast=bool
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -38,6 +66,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'users',
     'inventory',
     'sales',
@@ -50,6 +79,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'techapp.metrics.RequestMetricsMiddleware',
+    'techapp.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -69,6 +100,10 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,                    # optional: rotate tokens when refreshing
     "BLACKLIST_AFTER_ROTATION": True,                 # optional: blacklist old tokens
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # embed org, role and permission claims (see users/tokens.py)
+    "TOKEN_OBTAIN_SERIALIZER": "users.tokens.OrgTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.tokens.OrgTokenRefreshSerializer",
+    "TOKEN_USER_CLASS": "users.tokens.OrgTokenUser",
 }
 
 
@@ -98,10 +133,100 @@ AUTHENTICATION_BACKENDS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWTAuthentication with the user row cached (users/cache.py)
+        "users.authentication.CachedJWTAuthentication",
     ),
 }
 
+# Render and parse JSON with orjson (techapp/fastjson.py) instead of the
+# stdlib json module; same output, a fraction of the encoding time.
+FAST_JSON = config("FAST_JSON", default=True, cast=bool)
+if FAST_JSON:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
+        "techapp.fastjson.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    )
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"] = (
+        "techapp.fastjson.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    )
+
+# Per-endpoint query/latency metrics (techapp/metrics.py, /api/_metrics/)
+REQUEST_METRICS_ENABLED = config("REQUEST_METRICS_ENABLED", default=True, cast=bool)
+REQUEST_METRICS_SERVER_TIMING = config("REQUEST_METRICS_SERVER_TIMING", default=True, cast=bool)
+# /api/_metrics/ answers 404 until a token is set
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Resolve request.user from the token claims instead of a users-table lookup.
+# Token revocation then relies on the cache, so this requires REDIS_URL.
+if config("JWT_STATELESS_AUTH", default=False, cast=bool):
+    REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] = (
+        "users.authentication.StatelessJWTAuthentication",
+    )
+
+# Serve the hot read endpoints (me/, profile/, product list/detail) with the
+# async views in techapp/async_views.py. techapp/asgi.py turns this on.
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+
+# Channel layer behind /api/inventory/events/ (techapp/events.py). Use
+# techapp.events.PostgresEventBackend with more than one worker process.
+EVENT_BACKEND = config("EVENT_BACKEND", default="techapp.events.LocalEventBackend")
+
+# Caches. Without REDIS_URL each worker has its own memory cache, so
+# invalidation (access entries, revoked tokens, tenant metadata) only
+# reaches the worker that made the change.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL},
+    }
+else:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "OPTIONS": {"MAX_ENTRIES": 10000}},
+    }
+# In-process LRU in front of CACHES["default"] for users and organization
+# profiles (techapp/cache.py). LOCAL_TIMEOUT bounds how long another worker
+# can serve a changed entry; TIMEOUT only applies to a Redis shared tier, a
+# per-process one keeps entries for LOCAL_TIMEOUT as well.
+TIERED_CACHE = {
+    "MAX_ENTRIES": config("TIERED_CACHE_MAX_ENTRIES", default=2048, cast=int),
+    "LOCAL_TIMEOUT": config("TIERED_CACHE_LOCAL_TIMEOUT", default=10, cast=int),
+    "TIMEOUT": 300,
+    "SHARED": "default",
+}
+
+# Response compression (techapp/compression.py): brotli when installed and
+# accepted, gzip otherwise
+COMPRESSION = {
+    "MIN_SIZE": config("COMPRESSION_MIN_SIZE", default=1024, cast=int),
+    "CONTENT_TYPES": [
+        "application/json", "application/x-ndjson", "text/csv", "text/html", "text/plain",
+    ],
+    "GZIP_LEVEL": config("COMPRESSION_GZIP_LEVEL", default=6, cast=int),
+    "BROTLI_QUALITY": config("COMPRESSION_BROTLI_QUALITY", default=4, cast=int),
+    # responses carrying tokens are never compressed (BREACH)
+    "EXEMPT_URL_NAMES": ["token_obtain_pair", "token_refresh"],
+}
+
+# Bulk staff onboarding (/api/organizations/add-staff/bulk/): rows per request
+# and threads hashing the new passwords
+STAFF_PROVISIONING_MAX_ROWS = 1000
+STAFF_PROVISIONING_HASH_WORKERS = config(
+    "STAFF_PROVISIONING_HASH_WORKERS", default=min(8, os.cpu_count() or 1), cast=int
+)
+
+# Bulk product import (/api/inventory/products/import/)
+INVENTORY_IMPORT_BATCH_SIZE = config("INVENTORY_IMPORT_BATCH_SIZE", default=1000, cast=int)
+INVENTORY_IMPORT_MAX_BATCH_SIZE = 5000
+# Delta sync (/api/inventory/products/changes/): how far the token handed to
+# a caught-up client is moved back, to cover transactions still open meanwhile
+INVENTORY_SYNC_LAG_SECONDS = config("INVENTORY_SYNC_LAG_SECONDS", default=60, cast=int)
+# Rows fetched per server-side cursor round trip by /api/inventory/products/export/
+INVENTORY_EXPORT_CHUNK_SIZE = config("INVENTORY_EXPORT_CHUNK_SIZE", default=2000, cast=int)
+# Most products one /api/inventory/products/bulk/ request may change or delete
+INVENTORY_BULK_MAX_PRODUCTS = config("INVENTORY_BULK_MAX_PRODUCTS", default=5000, cast=int)
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -164,4 +289,11 @@ CORS_ALLOW_CREDENTIALS = True
 # Ensure Authorization header is allowed
 CORS_ALLOW_HEADERS = list(default_headers) + [
     "Authorization",
+    # conditional GETs sent by API clients themselves (see techapp/conditional.py)
+    "If-None-Match",
+    "If-Modified-Since",
 ]
+
+# Let the dashboard read per-request timings (see techapp/metrics.py) and
+# clients read the validators of conditional GETs
+CORS_EXPOSE_HEADERS = ["Server-Timing", "ETag", "Last-Modified"]
@@ -1,5 +1,6 @@
 from django.urls import path, include
 
+from techapp.metrics import metrics_view
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -11,5 +12,7 @@ urlpatterns = [
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/inventory/", include("inventory.urls")),
+    path("api/sales/", include("sales.urls")),
+    path("api/_metrics/", metrics_view, name="metrics"),
 
 ]
@@ -0,0 +1,187 @@
+# techapp/values.py
+"""
+Read-only list serialization straight from ``QuerySet.values()``.
+
+A ``ModelSerializer`` builds its field objects and calls every field's
+``to_representation`` for each row it renders. ``ValuesSerializer`` reads
+the serializer's readable fields once, at import time, and compiles them
+into one function per field:
+
+- fields whose database value is already the output (integers, strings,
+  booleans, related primary keys) are copied as they are;
+- the rest (decimals, dates, datetimes, ...) go through a fast converter
+  where one is known to give the same result, and through the field's own
+  ``to_representation`` otherwise.
+
+Rows are fetched with ``.values()`` (dotted sources become ``__`` lookups),
+so no model instances are built either. Output matches the serializer's;
+each use is covered by a parity test.
+"""
+import datetime
+import decimal
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, fields, relations
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .metrics import serializing
+
+# fields whose to_representation returns database values unchanged
+_PASSTHROUGH = (
+    fields.BooleanField, fields.CharField, fields.IntegerField, fields.ChoiceField,
+    relations.PrimaryKeyRelatedField,
+)
+
+
+def _iso_format(field, default):
+    output_format = getattr(field, "format", default)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def _utc_isoformat(value):
+    value = value.astimezone(datetime.timezone.utc).isoformat()
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+def _decimal_converter(field):
+    """``DecimalField.to_representation`` with its quantize context built once."""
+    coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        return f"{value.quantize(exponent, rounding=rounding, context=context):f}"
+    return convert
+
+
+def _converters(field):
+    """
+    ``(converter, converter outside UTC)`` for ``field``; ``None`` copies the
+    value. Datetimes render in the active time zone, so the fast UTC path is
+    only taken while UTC is active.
+    """
+    if isinstance(field, fields.DateTimeField):
+        if (
+            _iso_format(field, api_settings.DATETIME_FORMAT)
+            and getattr(field, "timezone", None) is None
+            and settings.USE_TZ
+        ):
+            return _utc_isoformat, field.to_representation
+        return field.to_representation, field.to_representation
+    if isinstance(field, fields.DateField) and _iso_format(field, api_settings.DATE_FORMAT):
+        convert = datetime.date.isoformat
+    elif isinstance(field, fields.DecimalField):
+        convert = _decimal_converter(field)
+    elif isinstance(field, _PASSTHROUGH):
+        convert = None
+    else:
+        convert = field.to_representation
+    return convert, convert
+
+
+class ValuesSerializer:
+    """
+    ``ValuesSerializer(ProductSerializer)``: ``queryset(qs)`` selects the
+    columns, ``represent(rows)`` turns the ``.values()`` rows into the
+    serializer's output.
+    """
+
+    def __init__(self, serializer_class, *, fields=None, zoned_fields=None):
+        self.serializer_class = serializer_class
+        if fields is None:
+            fields, zoned_fields = [], []
+            for name, field in serializer_class().fields.items():
+                if field.write_only:
+                    continue
+                if field.source == "*":
+                    raise ValueError(f"{serializer_class.__name__}.{name}: source='*' has no column to read.")
+                lookup = "__".join(field.source_attrs)
+                convert, zoned = _converters(field)
+                fields.append((name, lookup, convert))
+                zoned_fields.append((name, lookup, zoned))
+        self.fields, self.zoned_fields = fields, zoned_fields
+        self.lookups = tuple(dict.fromkeys(lookup for _, lookup, _ in self.fields))
+        # when every field reads its own column, a row is copied whole and
+        # only the converted values are replaced
+        self.copy_rows = [name for name, _, _ in self.fields] == list(self.lookups)
+
+    def subset(self, names):
+        """A ``ValuesSerializer`` for just the fields in ``names`` (sparse fieldsets)."""
+        names = set(names)
+        return ValuesSerializer(
+            self.serializer_class,
+            fields=[field for field in self.fields if field[0] in names],
+            zoned_fields=[field for field in self.zoned_fields if field[0] in names],
+        )
+
+    def queryset(self, queryset, extra=()):
+        """``queryset.values()`` of the fields' columns, plus the ``extra`` ones (e.g. for a cursor)."""
+        return queryset.values(*dict.fromkeys([*self.lookups, *extra]))
+
+    @serializing()
+    def represent(self, rows, drop=()):
+        """The serializer's output for ``rows``, leaving out the ``drop`` columns read for ``extra``."""
+        utc = timezone.get_current_timezone_name() == "UTC"
+        compiled = self.fields if utc else self.zoned_fields
+        if self.copy_rows:
+            converted = [(name, convert) for name, _, convert in compiled if convert is not None]
+            output = []
+            for row in rows:
+                row = dict(row)
+                for name in drop:
+                    del row[name]
+                for name, convert in converted:
+                    value = row[name]
+                    if value is not None:
+                        row[name] = convert(value)
+                output.append(row)
+            return output
+        return [
+            {
+                name: row[lookup] if convert is None or row[lookup] is None else convert(row[lookup])
+                for name, lookup, convert in compiled
+            }
+            for row in rows
+        ]
+
+
+class ValuesListMixin:
+    """
+    GET for a ``ListAPIView`` through ``values_serializer`` (a
+    ``ValuesSerializer`` of its ``serializer_class``); filters and
+    pagination apply as before. Writes keep using ``serializer_class``.
+    """
+    values_serializer = None
+
+    def get_values_serializer(self):
+        return self.values_serializer
+
+    def get_values_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        self._values = self.get_values_serializer()
+        # a keyset paginator reads its cursor from the ordering columns,
+        # which a sparse fieldset may leave out
+        ordering = ()
+        if hasattr(self.paginator, "get_ordering"):
+            ordering = self.paginator.get_ordering(self.request, queryset, self)
+        self._values_extra = [
+            name for name in dict.fromkeys(field.lstrip("-") for field in ordering) if name not in self._values.lookups
+        ]
+        return self._values.queryset(queryset, extra=self._values_extra)
+
+    def represent_values(self, rows):
+        return self._values.represent(rows, drop=self._values_extra)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_values_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.represent_values(page))
+        return Response(self.represent_values(queryset))
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .tokens import require_shared_cache
+
+        if "users.authentication.StatelessJWTAuthentication" in settings.REST_FRAMEWORK.get(
+            "DEFAULT_AUTHENTICATION_CLASSES", ()
+        ):
+            require_shared_cache()
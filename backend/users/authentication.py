@@ -0,0 +1,57 @@
+# users/authentication.py
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import get_cached_user
+from .tokens import is_revoked
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` with the user row read through ``users.cache``,
+    so a warm request costs no query to authenticate. ``request.user`` is a
+    real ``User``, at most ``TIERED_CACHE["LOCAL_TIMEOUT"]`` seconds stale
+    in other workers (see ``techapp.cache``): a deactivated user or a
+    changed password is refused everywhere within that time. Views that
+    must see the current row (password changes) pin ``JWTAuthentication``.
+    ``CHECK_REVOKE_TOKEN`` reads the deferred password hash, one query.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        # the same checks as JWTAuthentication.get_user
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authenticates from the token claims alone (see ``users.tokens``): no
+    query against the users, organizations or memberships tables. Tokens
+    revoked by a password change are refused.
+
+    ``request.user`` is an ``OrgTokenUser``, not a ``User``; views that need
+    the real row (password changes, staff creation) pin
+    ``JWTAuthentication`` instead.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_revoked(token):
+            raise InvalidToken("Token has been revoked.")
+        return token
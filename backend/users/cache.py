@@ -0,0 +1,28 @@
+# users/cache.py
+"""
+Cached ``User`` rows for ``CachedJWTAuthentication``, so authenticated
+requests skip the users-table lookup. Saves and deletes drop the entry
+(``users/signals.py``); ``QuerySet.update()`` and ``bulk_update`` do not, so
+call ``forget_user`` after those.
+
+The password hash is deferred, so it never reaches the shared cache;
+reading ``user.password`` on a cached user costs a query.
+"""
+import copy
+
+from techapp.cache import TieredCache
+from .models import User
+
+user_cache = TieredCache("user")
+
+
+def get_cached_user(user_id):
+    """The ``User`` with ``user_id``, or ``None``. Each call gets its own copy."""
+    # token claims carry the id as a string
+    user = user_cache.get_or_set(str(user_id), lambda: User.objects.defer("password").filter(pk=user_id).first())
+    # views may modify request.user; keep the cached instance pristine
+    return copy.copy(user) if user is not None else None
+
+
+def forget_user(*user_ids):
+    user_cache.delete(*(str(user_id) for user_id in user_ids))
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from organizations.models import Organization, Membership
+from organizations.models import Organization
+from organizations.tenants import create_tenant
 
 User = get_user_model()
 
@@ -43,37 +44,7 @@ class SignupSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        company_name = validated_data.pop("company_name")
-        preferences = validated_data.pop("preference")
-
-        # Create the user
-        user = User.objects.create_user(**validated_data)
-        user.is_superuser = True
-        user.is_staff = True
-        user.save()
-
-        # Create the organization
-        org = Organization.objects.create(
-            name=company_name,
-            preference=preferences,
-            owner=user
-        )
-
-        # Link the user to organization
-        user.current_org = org
-        user.company_name = org.name
-        user.save()
-
-        # Add default membership entry for owner
-        Membership.objects.create(
-            user=user,
-            organization=org,
-            role=Membership.Role.OWNER,
-            can_manage_users=True,
-            can_manage_inventory=True,
-            can_manage_sales=True,
-            can_manage_services=True,
-            can_view_reports=True,
+        return create_tenant(
+            preferences=validated_data.pop("preference"),
+            **validated_data,
         )
-
-        return user
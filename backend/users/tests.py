@@ -1,3 +1,200 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from organizations.access import PERMISSION_FLAGS
+from organizations.models import Membership, Organization
+from organizations.tenants import create_tenant
+from techapp.querybudget import PASSWORD, QueryBudgetTestCase, seed_tenant
+from .authentication import StatelessJWTAuthentication
+from .models import User
+from .tokens import OrgTokenObtainPairSerializer, require_shared_cache
+from .views import AsyncCurrentUserView
+
+
+class UsersQueryBudgetTests(QueryBudgetTestCase):
+    endpoints = {"signup", "change-password", "current-user"}
+
+    def test_current_user(self):
+        for size, owner, org in self.tenants():
+            client = self.client_for(owner)
+            self.assertBudget(1, client.get, reverse("current-user"), status=200)
+            self.assertBudget(0, client.get, reverse("current-user"), status=200)
+
+    def test_change_password(self):
+        for size, owner, org in self.tenants():
+            self.assertBudget(
+                2, self.client_for(owner).post, reverse("change-password"),
+                {"old_password": PASSWORD, "new_password": "changed-123", "confirm_password": "changed-123"},
+                format="json", status=200,
+            )
+
+    def test_signup(self):
+        for size, owner, org in self.tenants():
+            # two uniqueness checks, then four writes inside a savepoint
+            self.assertBudget(
+                8, self.client.post, reverse("signup"),
+                {
+                    "username": f"new{size}", "email": f"new{size}@example.com",
+                    "password": "signup-pass-123", "company_name": f"New {size}",
+                    "preference": ["commerce"],
+                },
+                content_type="application/json", status=201,
+            )
+
+
+class SignupTests(QueryBudgetTestCase):
+    def test_creates_owner_organization_and_membership(self):
+        response = self.client.post(reverse("signup"), {
+            "username": "founder", "email": "founder@Example.COM", "password": "signup-pass-123",
+            "company_name": "Founders", "preference": ["commerce", "pharmacy"], "phone_number": "0800",
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 201, response.json())
+
+        user = User.objects.get(username="founder")
+        self.assertTrue(user.check_password("signup-pass-123"))
+        self.assertEqual(user.email, "founder@example.com")
+        self.assertEqual((user.is_superuser, user.is_staff), (True, True))
+        self.assertEqual((user.company_name, user.phone_number), ("Founders", "0800"))
+        self.assertEqual(user.current_org, user.owned_organization)
+        self.assertEqual(user.current_org.preference, ["commerce", "pharmacy"])
+        self.assertEqual(user.membership.role, Membership.Role.OWNER)
+        # the flags signup has always given the owner
+        self.assertEqual(
+            {flag for flag in PERMISSION_FLAGS if getattr(user.membership, flag)},
+            {"can_manage_users", "can_manage_inventory", "can_manage_sales", "can_manage_services", "can_view_reports"},
+        )
+
+    def test_failure_leaves_no_partial_tenant(self):
+        create_tenant(username="taken", email="taken@example.com", password="pw", company_name="A", preferences=["other"])
+        with self.assertRaises(ValidationError):
+            # as if a concurrent signup won between validation and insert
+            create_tenant(username="other", email="taken@example.com", password="pw", company_name="B", preferences=["other"])
+        self.assertFalse(User.objects.filter(username="other").exists())
+        self.assertFalse(Organization.objects.filter(name="B").exists())
+
+
+class AsyncCurrentUserViewTests(QueryBudgetTestCase):
+    def test_matches_sync_view(self):
+        for size, owner, org in self.tenants():
+            url = reverse("current-user")
+            expected = self.client_for(owner).get(url).json()
+            # warmed by the sync request
+            response = self.assertBudget(0, self.async_view, AsyncCurrentUserView, "get", url, owner)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.content), expected)
+
+    def test_other_methods_go_to_sync_view(self):
+        for size, owner, org in self.tenants():
+            response = self.async_view(AsyncCurrentUserView, "post", reverse("current-user"), owner, {})
+            self.assertEqual(response.status_code, 405)
+
+
+class StatelessTokenTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner, self.org = seed_tenant("claims", staff=1)
+        self.membership = Membership.objects.get(organization=self.org, role=Membership.Role.STAFF)
+        self.staff = self.membership.user
+
+    def authenticate(self, access):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        return StatelessJWTAuthentication().authenticate(request)[0]
+
+    def sign_in(self, user):
+        response = self.client.post(
+            reverse("token_obtain_pair"), {"username": user.username, "password": PASSWORD},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_claims(self):
+        token = OrgTokenObtainPairSerializer.get_token(self.staff).access_token
+        self.assertEqual(
+            {claim: token[claim] for claim in ("username", "org_id", "role", "is_superuser")},
+            {"username": self.staff.username, "org_id": self.org.pk, "role": "staff", "is_superuser": False},
+        )
+        self.assertEqual(sorted(token["perms"]), ["can_manage_inventory", "can_manage_sales"])
+
+        user = self.authenticate(token)
+        self.assertEqual((user.pk, user.id, user.current_org_id), (self.staff.pk, self.staff.pk, self.org.pk))
+        access = user.org_access
+        self.assertEqual(access.role, "staff")
+        self.assertTrue(access.can("can_manage_sales"))
+        self.assertFalse(access.can("can_manage_users"))
+
+    def test_password_change_revokes_access_tokens(self):
+        access = self.sign_in(self.staff)["access"]
+        self.authenticate(access)
+        response = self.client.post(
+            reverse("change-password"),
+            {"old_password": PASSWORD, "new_password": "changed-123", "confirm_password": "changed-123"},
+            content_type="application/json", HTTP_AUTHORIZATION=f"Bearer {access}",
+        )
+        self.assertEqual(response.status_code, 200)
+        with self.assertRaises(InvalidToken):
+            self.authenticate(access)
+        # other users' tokens are untouched
+        self.authenticate(OrgTokenObtainPairSerializer.get_token(self.owner).access_token)
+
+    def test_membership_change_revokes_access_tokens(self):
+        before = OrgTokenObtainPairSerializer.get_token(self.staff).access_token
+        self.authenticate(before)
+        self.membership.can_manage_inventory = False
+        self.membership.save()
+        with self.assertRaises(InvalidToken):
+            self.authenticate(before)
+        # a token issued right after the change carries the new flags and is accepted
+        after = self.authenticate(OrgTokenObtainPairSerializer.get_token(self.staff).access_token)
+        self.assertFalse(after.org_access.can("can_manage_inventory"))
+
+    def test_membership_removal_revokes_access_tokens(self):
+        before = OrgTokenObtainPairSerializer.get_token(self.staff).access_token
+        self.membership.delete()
+        with self.assertRaises(InvalidToken):
+            self.authenticate(before)
+
+    def test_refresh_refused_for_missing_or_inactive_users(self):
+        refresh = self.sign_in(self.staff)["refresh"]
+        self.staff.is_active = False
+        self.staff.save()
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+        refresh = self.sign_in(self.owner)["refresh"]
+        self.org.delete()
+        self.owner.delete()
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_reads_current_membership(self):
+        refresh = self.sign_in(self.staff)["refresh"]
+        self.membership.can_manage_sales = False
+        self.membership.can_view_reports = True
+        self.membership.save()
+
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data["access"])
+        self.assertEqual(sorted(access["perms"]), ["can_manage_inventory", "can_view_reports"])
+        self.assertEqual(access["username"], self.staff.username)
+
+    def test_refresh_refused_after_password_change(self):
+        refresh = self.sign_in(self.staff)["refresh"]
+        self.staff.set_password("changed-123")
+        self.staff.save()
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_requires_a_shared_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            require_shared_cache()
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache"}}
+        with override_settings(CACHES=redis):
+            require_shared_cache()
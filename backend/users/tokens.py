@@ -0,0 +1,124 @@
+# users/tokens.py
+"""
+JWT claims for stateless authentication.
+
+Tokens from ``/api/token/`` carry the user's identity, organization, role
+and permission flags, so ``StatelessJWTAuthentication`` can build the
+request user from the token alone. Access tokens issued before a password
+change, or before a change to the user's membership (role, flags, removal),
+are refused through a short-lived revocation entry, so the client refreshes
+and gets the current claims; refresh tokens carry a fingerprint of the
+password hash and stop refreshing once it changes.
+
+The revocation entry lives in the default cache, which every worker must
+share: ``require_shared_cache`` refuses to start stateless authentication
+on a per-process cache.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.crypto import salted_hmac
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import AccessToken
+from techapp.cache import PROCESS_LOCAL_CACHES
+from organizations.access import OrgAccess, load_access
+
+User = get_user_model()
+
+
+def password_fingerprint(user):
+    return salted_hmac("users.tokens.password", user.password).hexdigest()[:16]
+
+
+def add_user_claims(token, user):
+    access = load_access(user)
+    token["username"] = user.username
+    token["email"] = user.email
+    token["company_name"] = user.company_name
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token["org_id"] = user.current_org_id
+    token["role"] = access.role
+    token["perms"] = [flag for flag, allowed in access.flags.items() if allowed]
+    token["pwd"] = password_fingerprint(user)
+    # iat has whole seconds; revocation needs to tell apart tokens issued
+    # just before and just after a change
+    token["issued_at"] = time.time()
+    return token
+
+
+def _revocation_key(user_id):
+    return f"jwt-revoked-before:{user_id}"
+
+
+def revoke_tokens(user_id):
+    """Refuse every access token issued to the user before now."""
+    cache.set(
+        _revocation_key(user_id),
+        time.time(),
+        int(settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds()),
+    )
+
+
+def is_revoked(token):
+    revoked_before = cache.get(_revocation_key(token[api_settings.USER_ID_CLAIM]))
+    return revoked_before is not None and token.get("issued_at", token.get("iat", 0)) <= revoked_before
+
+
+def require_shared_cache():
+    """Raise ``ImproperlyConfigured`` if revocations would not reach other workers."""
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"JWT_STATELESS_AUTH needs a cache shared by all workers (set REDIS_URL), not {backend}: "
+            "tokens revoked by a password change would still be accepted by other workers."
+        )
+
+
+class OrgTokenUser(TokenUser):
+    """TokenUser that exposes the organization claims like a ``User`` would."""
+
+    @cached_property
+    def id(self):
+        # the claim is a string; serializers must see the same int a User has
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def current_org_id(self):
+        return self.token.get("org_id")
+
+    @property
+    def org_access(self):
+        perms = self.token.get("perms", [])
+        return OrgAccess(self.pk, self.current_org_id, self.token.get("role"), dict.fromkeys(perms, True))
+
+
+class OrgTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class OrgTokenRefreshSerializer(TokenRefreshSerializer):
+    """Re-reads the user on refresh so role and permission changes reach new access tokens."""
+
+    def validate(self, attrs):
+        # checked before TokenRefreshSerializer, whose user lookup raises
+        # DoesNotExist (a 500) for a deleted user
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(pk=refresh.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not user.is_active:
+            raise InvalidToken("User not found or inactive.")
+        # tokens issued before fingerprints were added have no "pwd" claim
+        if "pwd" in refresh and refresh["pwd"] != password_fingerprint(user):
+            raise InvalidToken("Password changed; please sign in again.")
+        data = super().validate(attrs)
+        data["access"] = str(add_user_claims(AccessToken(data["access"]), user))
+        return data
@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.urls import path
-from .views import SignupView, ChangePasswordView, CurrentUserView
+from .views import SignupView, ChangePasswordView, CurrentUserView, AsyncCurrentUserView
+
+MeView = AsyncCurrentUserView if settings.ASYNC_VIEWS else CurrentUserView
 
 urlpatterns = [
     path('signup/', SignupView.as_view(), name='signup'),
     path("change-password/", ChangePasswordView.as_view(), name="change-password"),
-    path("me/", CurrentUserView.as_view(), name="current-user"),
+    path("me/", MeView.as_view(), name="current-user"),
 ]
@@ -3,6 +3,9 @@ from rest_framework.response import Response
 from .serializers import SignupSerializer
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from techapp.async_views import AsyncAPIView
+from .tokens import revoke_tokens
 
 class SignupView(generics.CreateAPIView):
     serializer_class = SignupSerializer
@@ -26,11 +29,26 @@ class CurrentUserView(APIView):
             "company_name": getattr(user, "company_name", None),
         })
 
+
+class AsyncCurrentUserView(AsyncAPIView):
+    """``CurrentUserView`` for ASGI deployments (see ``settings.ASYNC_VIEWS``)."""
+    sync_view = CurrentUserView
+
+    async def get(self, request):
+        user = request.user
+        return {
+            "username": user.username,
+            "email": user.email,
+            "company_name": getattr(user, "company_name", None),
+        }
+
 class ChangePasswordView(APIView):
     """
     Allows authenticated users to change their password securely.
     """
     permission_classes = [permissions.IsAuthenticated]
+    # needs the real User row to check and set the password
+    authentication_classes = [JWTAuthentication]
 
     def post(self, request):
         user = request.user
@@ -52,5 +70,6 @@ class ChangePasswordView(APIView):
 
         user.set_password(new_password)
         user.save()
+        revoke_tokens(user.pk)
 
         return Response({"message": "Password changed successfully."}, status=200)
\ No newline at end of file
@@ -8,4 +8,20 @@ const api = axios.create({
   },
 });
 
+// Trade the stored refresh token for a new access token (the refresh token
+// rotates too). Resolves to false when there is none or it was refused; the
+// user then has to sign in again.
+export async function refreshAccessToken(): Promise<boolean> {
+  const refresh = localStorage.getItem("refresh");
+  if (!refresh) return false;
+  try {
+    const res = await axios.post(`${import.meta.env.VITE_BACKEND_URL}/api/token/refresh/`, { refresh });
+    localStorage.setItem("access", res.data.access);
+    if (res.data.refresh) localStorage.setItem("refresh", res.data.refresh);
+    return true;
+  } catch {
+    return false;
+  }
+}
+
 export default api;
@@ -0,0 +1,72 @@
+// src/events.ts
+// Live inventory changes from /api/inventory/events/ (server-sent events).
+// EventSource cannot send the Authorization header, so the stream is read
+// with fetch. Servers without the stream (plain WSGI) answer 404; callers
+// then just keep the data they loaded. A 401 (expired or revoked access
+// token) refreshes the token once and reconnects; if that fails the stream
+// stops and onError is told.
+
+import { refreshAccessToken } from "./api";
+
+export interface InventoryEvent {
+  type: string; // product.created|updated|deleted, stock.adjusted or resync
+  count?: number;
+  ids?: number[];
+  products?: { id: number; quantity: number }[];
+}
+
+export function subscribeToInventory(
+  onEvent: (event: InventoryEvent) => void,
+  onError: (error: Error) => void = (error) => console.error(error.message),
+): () => void {
+  const controller = new AbortController();
+  let retry = 5000;
+  let refreshed = false;
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const res = await fetch(`${import.meta.env.VITE_BACKEND_URL}/api/inventory/events/`, {
+          headers: { Authorization: `Bearer ${localStorage.getItem("access")}` },
+          signal: controller.signal,
+        });
+        if (res.status === 404) return;
+        if (res.status === 401) {
+          if (refreshed || !(await refreshAccessToken())) {
+            if (!controller.signal.aborted) onError(new Error("Inventory event stream: session expired, sign in again."));
+            return;
+          }
+          refreshed = true;
+          continue;
+        }
+        if (!res.ok || !res.body) throw new Error(`event stream: ${res.status}`);
+        refreshed = false;
+
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = "";
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          const messages = buffer.split("\n\n");
+          buffer = messages.pop() ?? "";
+          for (const message of messages) {
+            for (const line of message.split("\n")) {
+              if (line.startsWith("retry: ")) retry = Number(line.slice(7));
+              if (line.startsWith("data: ")) onEvent(JSON.parse(line.slice(6)));
+            }
+          }
+        }
+        // reconnected: whatever happened meanwhile was missed
+        onEvent({ type: "resync" });
+      } catch (error) {
+        if (controller.signal.aborted) return;
+        console.error("Inventory event stream failed:", error);
+      }
+      await new Promise((resolve) => setTimeout(resolve, retry));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+}
@@ -1,11 +1,15 @@
 import { useEffect, useState } from "react";
 import api from "../api";
+import { subscribeToInventory } from "../events";
 
 export default function Dashboard() {
   const [org, setOrg] = useState<{ name: string; preference: string[] }>({
     name: "",
     preference: [],
   });
+  const [summary, setSummary] = useState<{ total_value: string; low_stock_count: number } | null>(
+    null
+  );
 
   useEffect(() => {
     const fetchOrgProfile = async () => {
@@ -16,7 +20,18 @@ export default function Dashboard() {
         console.error("Failed to load organization profile:", err);
       }
     };
+    const fetchSummary = async () => {
+      try {
+        const res = await api.get("/api/inventory/summary/");
+        setSummary(res.data);
+      } catch (err) {
+        console.error("Failed to load inventory summary:", err);
+      }
+    };
     fetchOrgProfile();
+    fetchSummary();
+    // stock value and low-stock count follow product changes live
+    return subscribeToInventory(() => fetchSummary());
   }, []);
 
   return (
@@ -32,9 +47,18 @@ export default function Dashboard() {
         </span>
       </header>
 
-      <div className="grid grid-cols-2 md:grid-cols-4 gap-6">
+      <div className="grid grid-cols-2 md:grid-cols-5 gap-6">
         <DashboardCard title="Today's Sales" value="₦145,000" icon="$" />
-        <DashboardCard title="Low Stock Items" value="12" icon="📦" />
+        <DashboardCard
+          title="Low Stock Items"
+          value={summary ? String(summary.low_stock_count) : "-"}
+          icon="📦"
+        />
+        <DashboardCard
+          title="Stock Value"
+          value={summary ? `₦${Number(summary.total_value).toLocaleString()}` : "-"}
+          icon="🏷️"
+        />
         <DashboardCard title="Pending Orders" value="7" icon="🧾" />
         <DashboardCard title="Active Staff" value="5" icon="👥" />
       </div>
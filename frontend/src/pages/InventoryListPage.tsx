@@ -1,6 +1,7 @@
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { Plus, Search } from "lucide-react";
 import api from "../api";
+import { subscribeToInventory } from "../events";
 import AddProductModal from "../components/AddProductModal";
 
 interface Product {
@@ -15,20 +16,36 @@ interface Product {
   date_supplied: string;
 }
 
+// the columns the table shows; the API leaves the rest out (?fields=)
+const PRODUCT_FIELDS = "id,name,model,serial_number,quantity,unit_price,total_value,supplier_name,date_supplied";
+
 export default function InventoryListPage() {
   const [products, setProducts] = useState<Product[]>([]);
+  const [next, setNext] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [search, setSearch] = useState("");
   const [showModal, setShowModal] = useState(false);
 
   useEffect(() => {
-    fetchProducts();
-  }, []);
+    // search runs on the server; wait for the user to stop typing
+    const timer = setTimeout(() => fetchProducts(), 300);
+    return () => clearTimeout(timer);
+  }, [search]);
+
+  // reload the first page whenever products change elsewhere
+  const refresh = useRef(() => {});
+  refresh.current = () => fetchProducts();
+  useEffect(() => subscribeToInventory(() => refresh.current()), []);
 
-  const fetchProducts = async () => {
+  const fetchProducts = async (url?: string) => {
     try {
-      const res = await api.get("/api/inventory/products/");
-      setProducts(res.data);
+      const res = url
+        ? await api.get(url)
+        : await api.get("/api/inventory/products/", {
+            params: search ? { fields: PRODUCT_FIELDS, search } : { fields: PRODUCT_FIELDS },
+          });
+      setProducts((prev) => (url ? [...prev, ...res.data.results] : res.data.results));
+      setNext(res.data.next);
     } catch (error) {
       console.error("Error fetching products:", error);
     } finally {
@@ -36,10 +53,6 @@ export default function InventoryListPage() {
     }
   };
 
-  const filteredProducts = products.filter((p) =>
-    p.name.toLowerCase().includes(search.toLowerCase())
-  );
-
   return (
     <div className="min-h-screen bg-slate-900 text-white p-8">
       {/* HEADER */}
@@ -58,7 +71,7 @@ export default function InventoryListPage() {
         <Search className="absolute left-3 top-3 text-slate-400 w-5 h-5" />
         <input
           type="text"
-          placeholder="Search product by name..."
+          placeholder="Search by name, model, serial or supplier..."
           value={search}
           onChange={(e) => setSearch(e.target.value)}
           className="pl-10 w-full p-3 rounded-lg bg-slate-800 border border-slate-700 focus:outline-none focus:ring-2 focus:ring-emerald-500"
@@ -68,7 +81,7 @@ export default function InventoryListPage() {
       {/* TABLE */}
       {loading ? (
         <p className="text-slate-400 text-center">Loading products...</p>
-      ) : filteredProducts.length === 0 ? (
+      ) : products.length === 0 ? (
         <p className="text-slate-400 text-center">No products found.</p>
       ) : (
         <div className="overflow-x-auto">
@@ -86,7 +99,7 @@ export default function InventoryListPage() {
               </tr>
             </thead>
             <tbody>
-              {filteredProducts.map((p) => (
+              {products.map((p) => (
                 <tr
                   key={p.id}
                   className="border-t border-slate-700 hover:bg-slate-800 transition"
@@ -105,6 +118,14 @@ export default function InventoryListPage() {
               ))}
             </tbody>
           </table>
+          {next && (
+            <button
+              onClick={() => fetchProducts(next)}
+              className="mt-4 w-full bg-slate-800 hover:bg-slate-700 px-5 py-2 rounded-lg text-slate-300 transition"
+            >
+              Load more
+            </button>
+          )}
         </div>
       )}
 
@@ -112,7 +133,7 @@ export default function InventoryListPage() {
       {showModal && (
         <AddProductModal
           onClose={() => setShowModal(false)}
-          onAdded={fetchProducts}
+          onAdded={() => fetchProducts()}
         />
       )}
     </div>